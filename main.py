@@ -14,7 +14,6 @@ sys.path.append(project_root)
 
 from scripts.download_billings import main as download_billings
 from scripts.process_payments_llama import process_input_folder as process_checks
-from scripts.matching_gui import show_matching_gui
 from scripts.matcher import match_payments
 
 def check_required_files(folder_path):
@@ -55,13 +54,14 @@ async def main():
         print("3. Bank of America transactions (filename starting with 'stmt')")
         return
     
-    # Step 2: Download latest billings
-    print("\nDownloading latest billings...")
-    billings = await download_billings(folder_path)
-    
-    # Step 3: Process checks with OCR
-    print("\nProcessing checks with OCR...")
-    check_data = await process_checks(folder_path)
+    # Steps 2 and 3: Download latest billings while the checks are processed with OCR;
+    # neither depends on the other, so the Knack fetch overlaps the OCR work.
+    # The task group cancels the other step if one of them fails
+    print("\nDownloading latest billings and processing checks with OCR...")
+    async with asyncio.TaskGroup() as tg:
+        billings_task = tg.create_task(download_billings(folder_path))
+        checks_task = tg.create_task(process_checks(folder_path))
+    billings, check_data = billings_task.result(), checks_task.result()
     if not check_data:
         print("No check data was processed. Exiting...")
         return
@@ -71,6 +71,8 @@ async def main():
     matches = match_payments(check_data, billings)
     
     # Step 5: Show GUI for reviewing matches
+    # The review GUI pulls in PyQt5, OpenCV and PIL, so it's only imported once there's something to review
+    from scripts.matching_gui import show_matching_gui
     print("\nLaunching GUI for match review...")
     final_matches = show_matching_gui(check_data, matches)
     
@@ -89,4 +91,10 @@ async def main():
         print("\nNo matches were finalized. Exiting without saving...")
 
 if __name__ == "__main__":
+    # Use uvloop's faster event loop where it's installed (it isn't available on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from src.config import ENCRYPTION_KEY, get_cipher_suite
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directory holding the saved session (cookies + local storage) for each institution
+STATE_DIR = os.getenv('BROWSER_STATE_DIR', 'browser_state')
+
+# Chromium flags for running headless in containers and on servers
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-blink-features=AutomationControlled"
+]
+
+# Set DEBUG_PLAYWRIGHT to watch the browser (also needed to answer bank security prompts by hand)
+HEADFUL = bool(os.getenv('DEBUG_PLAYWRIGHT'))
+
+# Resource types the scrapers never read, blocked to speed up page loads
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# URL fragments of the check image endpoints, which must still load for screenshots
+ALLOWED_IMAGE_MARKERS = ("checkimage", "/images/check/")
+
+async def _block_unneeded_resources(route):
+    """Abort images, fonts and media except for check images"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES and not any(
+        marker in request.url.lower() for marker in ALLOWED_IMAGE_MARKERS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+class BrowserManager:
+    """Shares one Playwright browser across the financial clients, with one context per institution"""
+    _playwright: Optional[Playwright] = None
+    _browser: Optional[Browser] = None
+    _contexts: Dict[str, BrowserContext] = {}
+    _lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def _get_lock(cls) -> asyncio.Lock:
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        return cls._lock
+
+    @staticmethod
+    def state_path(institution: str) -> str:
+        """Path of the saved session for an institution"""
+        return os.path.join(STATE_DIR, f"state_{institution}.json")
+
+    @classmethod
+    async def get_browser(cls) -> Browser:
+        """Start Playwright and launch Chromium on first use"""
+        async with cls._get_lock():
+            if cls._browser is None or not cls._browser.is_connected():
+                if cls._playwright is None:
+                    cls._playwright = await async_playwright().start()
+                cls._browser = await cls._playwright.chromium.launch(
+                    headless=not HEADFUL,
+                    slow_mo=100 if HEADFUL else 0,
+                    args=LAUNCH_ARGS
+                )
+                cls._contexts.clear()
+                logger.debug("Launched shared Chromium browser")
+            return cls._browser
+
+    @classmethod
+    async def get_context(cls, institution: str) -> BrowserContext:
+        """Return the context for an institution, restoring its saved session if there is one"""
+        context = cls._contexts.get(institution)
+        if context is not None:
+            return context
+
+        browser = await cls.get_browser()
+        async with cls._get_lock():
+            context = cls._contexts.get(institution)
+            if context is None:
+                context = await browser.new_context(storage_state=cls._load_state(institution))
+                await context.route("**/*", _block_unneeded_resources)
+                cls._contexts[institution] = context
+                logger.debug(f"Created browser context for {institution}")
+            return context
+
+    @classmethod
+    def _load_state(cls, institution: str) -> Optional[Dict]:
+        """Read and decrypt a saved session; sessions are only kept when an encryption key is configured"""
+        state_path = cls.state_path(institution)
+        if not ENCRYPTION_KEY or not os.path.exists(state_path):
+            return None
+        try:
+            with open(state_path, 'rb') as f:
+                data = f.read()
+            return json.loads(get_cipher_suite().decrypt(data))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable session state for {institution}: {e}")
+            return None
+
+    @classmethod
+    async def save_state(cls, institution: str):
+        """Persist an institution's session so later runs can skip the login flow"""
+        context = cls._contexts.get(institution)
+        if context is None:
+            return
+        # The state holds live session cookies, so it's never written to disk unencrypted
+        if not ENCRYPTION_KEY:
+            logger.debug(f"Not saving session state for {institution}: no ENCRYPTION_KEY configured")
+            return
+        data = get_cipher_suite().encrypt(json.dumps(await context.storage_state()).encode('utf-8'))
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(cls.state_path(institution), 'wb') as f:
+            f.write(data)
+        logger.debug(f"Saved session state for {institution}")
+
+    @staticmethod
+    async def is_logged_in(page: Page, url: str, selector: str, timeout: int = 5000) -> bool:
+        """Cheap check that a restored session is still signed in"""
+        try:
+            await page.goto(url)
+            await page.wait_for_selector(selector, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    async def close(cls):
+        """Close every context, the browser and Playwright"""
+        async with cls._get_lock():
+            for context in cls._contexts.values():
+                await context.close()
+            cls._contexts.clear()
+            if cls._browser is not None:
+                await cls._browser.close()
+                cls._browser = None
+            if cls._playwright is not None:
+                await cls._playwright.stop()
+                cls._playwright = None
+
+class PagePool:
+    """Bounded pool of pages in one context, so work can fan out without opening unlimited tabs"""
+    def __init__(self, context: BrowserContext, size: int):
+        self.context = context
+        self.size = size
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: List[Page] = []
+        self._pages: List[Page] = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a page, opening a new one only when none are idle"""
+        async with self._semaphore:
+            page = self._idle.pop() if self._idle else None
+            if page is None:
+                page = await self.context.new_page()
+                self._pages.append(page)
+            try:
+                yield page
+            finally:
+                self._idle.append(page)
+
+    async def close(self):
+        """Close every page the pool opened"""
+        for page in self._pages:
+            await page.close()
+        self._pages.clear()
+        self._idle.clear()
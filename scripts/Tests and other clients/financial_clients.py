@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import copy
 from datetime import datetime, timedelta
 import plaid
 import os
@@ -8,15 +9,18 @@ import json
 import asyncio
 import logging
 import time
-from playwright.async_api import async_playwright
+import httpx
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from tenacity import retry, stop_after_attempt, wait_exponential
 from cryptography.fernet import Fernet
 from .nova_client import NovaClient
 from .check_utils import CheckProcessor
+from .browser_manager import BrowserManager, PagePool
+from .transaction_cache import TransactionCache
 from src.config import (
     PLAID_CLIENT_ID, PLAID_SECRET,
-    BOFA_USERNAME, BOFA_PASSWORD, BOFA_ACCOUNT_NUMBER,
-    WELLS_FARGO_USERNAME, WELLS_FARGO_PASSWORD, WELLS_FARGO_ACCOUNT_NUMBER
+    get_bofa_username, get_bofa_password, BOFA_ACCOUNT_NUMBER,
+    get_wells_fargo_username, get_wells_fargo_password, WELLS_FARGO_ACCOUNT_NUMBER
 )
 import re
 from bill import Bill
@@ -24,6 +28,71 @@ from bill import Bill
 # Load environment variables
 load_dotenv()
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Check number in a transaction description, e.g. "Check #1234"
+CHECK_NUMBER_RE = re.compile(r'Check #(\d+)')
+
+# In-page scripts that read all the fields of every matched element in one call
+ROW_FIELDS_JS = """rows => rows.map(row => ({
+    date: row.querySelector('.date')?.innerText ?? null,
+    description: row.querySelector('.description')?.innerText ?? null,
+    amount: row.querySelector('.amount')?.innerText ?? null,
+    transaction_id: row.getAttribute('data-transaction-id')
+}))"""
+CHECK_CONTAINER_FIELDS_JS = """containers => containers.map(container => ({
+    amount: container.querySelector('.check-amount')?.innerText ?? null,
+    check_number: container.querySelector('.check-number')?.innerText ?? null
+}))"""
+
+# Number of pages used to fetch check images in parallel (kept small to avoid tripping bank anti-automation)
+CHECK_PAGE_POOL_SIZE = 4
+
+async def _get_src(element) -> Optional[str]:
+    """Return an image element's src, or None when the element is missing"""
+    if element is None:
+        return None
+    return await element.get_attribute('src')
+
+async def _fetch_body(request_ctx, src: Optional[str]) -> Optional[bytes]:
+    """Download an image URL with the browser context's cookies, without rendering it;
+    returns None when the bank answers with an error or a page instead of an image"""
+    if not src:
+        return None
+    response = await request_ctx.get(src)
+    try:
+        # Playwright doesn't raise on error statuses, and an expired session gets a login page back
+        content_type = response.headers.get('content-type', '')
+        if not response.ok or content_type.startswith('text/'):
+            logger.warning(f"Image download failed ({response.status}, {content_type or 'no content type'}): {src}")
+            return None
+        return await response.body()
+    finally:
+        # Playwright keeps a copy of every response body until it is disposed
+        await response.dispose()
+
+async def _apply_filter(page, button_selector: str):
+    """Submit a transaction filter and wait for the refreshed data instead of a fixed delay"""
+    try:
+        async with page.expect_response(lambda r: 'transaction' in r.url.lower() and r.ok, timeout=15000):
+            await page.click(button_selector)
+    except PlaywrightTimeoutError:
+        logger.debug("No transaction data response seen after applying the filter")
+    await page.wait_for_selector('.transaction-row')
+
+async def _download_image_element(page, element) -> Optional[bytes]:
+    """Download the original bytes behind an image element, falling back to a screenshot of it"""
+    src = await element.evaluate("e => e.currentSrc || e.src || null")
+    if src and not src.startswith('data:'):
+        try:
+            data = await _fetch_body(page.context.request, src)
+            if data:
+                return data
+        except Exception as e:
+            logger.debug(f"Direct image download failed, using a screenshot instead: {e}")
+    return await element.screenshot()
+
 class FinancialClient(ABC):
     @abstractmethod
     async def get_transactions(self, start_date: datetime, end_date: datetime) -> List[Dict]:
@@ -33,14 +102,111 @@ class FinancialClient(ABC):
     async def get_check_image(self, transaction_id: str) -> Optional[bytes]:
         pass
 
-class BankOfAmericaClient(FinancialClient):
+class PlaywrightBankClient(FinancialClient):
+    """Shared browser flow for banks that are scraped through Playwright"""
+    # Key for the bank's browser context and saved session
+    BANK_KEY = ''
+    # Page that only renders when signed in, used to probe a restored session
+    OVERVIEW_PATH = ''
+    # Check image page (formatted with the transaction id) and the image element on it
+    CHECK_IMAGE_PATH = ''
+    CHECK_IMAGE_SELECTOR = ''
+
+    @abstractmethod
+    async def login(self, page) -> bool:
+        pass
+
+    @abstractmethod
+    async def _scrape_transactions(self, start_date: datetime, end_date: datetime) -> Tuple[List[Dict], bool]:
+        """Scraped transactions, and whether the bank's date filter limited them to the range"""
+        pass
+
+    async def get_transactions(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Get transactions, only scraping the days in the range that aren't cached yet"""
+        account = self.account_number[-4:]
+        start, end = start_date.date(), end_date.date()
+        missing = self.transaction_cache.missing_days(self.BANK_KEY, account, start, end)
+        
+        if missing:
+            # Scrape the span covering every missing day in one pass of the bank's date filter
+            scrape_start, scrape_end = missing[0], missing[-1]
+            try:
+                scraped, filtered = await self._scrape_transactions(
+                    datetime.combine(scrape_start, datetime.min.time()),
+                    datetime.combine(scrape_end, datetime.min.time())
+                )
+            except Exception:
+                logger.exception("Error getting transactions")
+                return []
+            
+            # Without the date filter the page shows the bank's default range, which may not
+            # cover every day, so use what was found but don't record the days as scraped
+            if not filtered:
+                logger.warning(f"{self.BANK_KEY} date filter wasn't applied; not caching the scraped transactions")
+                start_str, end_str = start.isoformat(), end.isoformat()
+                return [transaction for transaction in scraped if start_str <= transaction['date'] <= end_str]
+            self.transaction_cache.store(self.BANK_KEY, account, scrape_start, scrape_end, scraped)
+        else:
+            logger.info(f"Using cached {self.BANK_KEY} transactions for {start} to {end}")
+        
+        return self.transaction_cache.range(self.BANK_KEY, account, start, end)
+
+    async def ensure_logged_in(self, page) -> bool:
+        """Reuse the saved session when it is still signed in, otherwise run the full login"""
+        if await BrowserManager.is_logged_in(page, f"{self.base_url}{self.OVERVIEW_PATH}", '.account-tile'):
+            return True
+        if await self.login(page):
+            await BrowserManager.save_state(self.BANK_KEY)
+            return True
+        return False
+
+    async def _open_overview(self, page):
+        """Show the account overview, skipping the navigation when signing in already left the page there"""
+        overview_url = f"{self.base_url}{self.OVERVIEW_PATH}"
+        if page.url != overview_url and not await page.query_selector('.account-tile'):
+            await page.goto(overview_url)
+        await page.wait_for_selector('.account-tile')
+
+    async def get_check_image(self, transaction_id: str) -> Optional[bytes]:
+        """Get a check image from the bank's check image page"""
+        try:
+            # Open a page in the shared browser, reusing this bank's session
+            context = await BrowserManager.get_context(self.BANK_KEY)
+            page = await context.new_page()
+            try:
+                if await self.ensure_logged_in(page):
+                    # Navigate to check image
+                    await page.goto(f"{self.base_url}{self.CHECK_IMAGE_PATH.format(transaction_id=transaction_id)}")
+                    await page.wait_for_selector(self.CHECK_IMAGE_SELECTOR)
+
+                    # Download image
+                    image_element = await page.query_selector(self.CHECK_IMAGE_SELECTOR)
+                    if image_element:
+                        return await _download_image_element(page, image_element)
+                
+            finally:
+                await page.close()
+        except Exception:
+            logger.exception("Error getting check image")
+        
+        return None
+
+class BankOfAmericaClient(PlaywrightBankClient):
+    BANK_KEY = 'bofa'
+    OVERVIEW_PATH = "/myaccounts/brain/redirect.go?source=overview&target=acctDetails"
+    CHECK_IMAGE_PATH = "/checkimage/{transaction_id}"
+    CHECK_IMAGE_SELECTOR = "#check-image"
+
     def __init__(self):
-        self.username = BOFA_USERNAME
-        self.password = BOFA_PASSWORD
+        self.username = get_bofa_username()
+        self.password = get_bofa_password()
         self.account_number = BOFA_ACCOUNT_NUMBER
         self.base_url = "https://www.bankofamerica.com"
         self.nova_client = NovaClient()
+        self.transaction_cache = TransactionCache()
         self.check_processor = CheckProcessor()
+        # Check images already fetched this session, by transaction id
+        self._checks_by_txid: Dict[str, List[Dict]] = {}
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def login(self, page):
@@ -95,6 +261,11 @@ class BankOfAmericaClient(FinancialClient):
     async def get_check_images(self, page, transaction_id) -> List[Dict]:
         """Get check images from Bank of America for a specific transaction.
         Each transaction may contain multiple checks, each with front and back images."""
+        # Repeat lookups in the same session (retries, validation re-runs) skip the UI workflow;
+        # callers get their own copy since saving the images strips their bytes
+        if transaction_id in self._checks_by_txid:
+            return copy.deepcopy(self._checks_by_txid[transaction_id])
+        
         try:
             # Click into the transaction detail
             await page.click(f'[data-transaction-id="{transaction_id}"]')
@@ -102,10 +273,14 @@ class BankOfAmericaClient(FinancialClient):
             
             check_images = []
             
-            # Look for multiple check containers
+            # Fetch image bytes over the context's HTTP client so the viewer page never navigates away
+            request_ctx = page.context.request
+            
+            # Look for multiple check containers, reading their text fields in one round trip
             check_containers = await page.query_selector_all('.check-container')
+            container_fields = await page.eval_on_selector_all('.check-container', CHECK_CONTAINER_FIELDS_JS)
             
-            for i, container in enumerate(check_containers):
+            for i, (container, fields) in enumerate(zip(check_containers, container_fields)):
                 # Find and click the "View Check Image" button for this check
                 view_check_button = await container.query_selector('.view-check-image')
                 if view_check_button:
@@ -121,49 +296,57 @@ class BankOfAmericaClient(FinancialClient):
                         'images': []
                     }
                     
-                    # Process front image
-                    if front_image:
-                        front_src = await front_image.get_attribute('src')
-                        front_response = await page.goto(front_src)
-                        front_image_data = await front_response.body()
+                    # Resolve both image URLs and start both downloads together
+                    front_src, back_src = await asyncio.gather(_get_src(front_image), _get_src(back_image))
+                    front_task = asyncio.create_task(_fetch_body(request_ctx, front_src))
+                    back_task = asyncio.create_task(_fetch_body(request_ctx, back_src))
+                    
+                    # Start Nova on the front image while the back image is still downloading
+                    front_image_data = await front_task
+                    nova_task = None
+                    nova_results = None
+                    if front_image_data:
                         check_data['images'].append({
                             'type': 'front',
                             'data': front_image_data
                         })
                         
-                        # Analyze front image with Nova
-                        nova_results = self.nova_client.analyze_check_image(front_image_data)
-                        if 'error' not in nova_results:
-                            check_data.update({
-                                'nova_analysis': nova_results,
-                                'extracted_amount': nova_results.get('amount'),
-                                'extracted_date': nova_results.get('date'),
-                                'extracted_payee': nova_results.get('payee'),
-                                'extracted_check_number': nova_results.get('check_number'),
-                                'extracted_routing_number': nova_results.get('routing_number'),
-                                'confidence_score': nova_results.get('confidence_score', 0)
-                            })
+                        # NovaClient returns cached analyses for images it has seen before
+                        nova_task = asyncio.create_task(self.nova_client.analyze_check_image(
+                            f"{transaction_id}_{i + 1}",
+                            front_image_data
+                        ))
                     
                     # Process back image
-                    if back_image:
-                        back_src = await back_image.get_attribute('src')
-                        back_response = await page.goto(back_src)
+                    back_image_data = await back_task
+                    if back_image_data:
                         check_data['images'].append({
                             'type': 'back',
-                            'data': await back_response.body()
+                            'data': back_image_data
                         })
                     
                     # Get check amount if available
-                    amount_elem = await container.query_selector('.check-amount')
-                    if amount_elem:
-                        amount_text = await amount_elem.inner_text()
-                        check_data['amount'] = float(amount_text.replace('$', '').replace(',', ''))
+                    if fields['amount']:
+                        check_data['amount'] = float(fields['amount'].replace('$', '').replace(',', ''))
                     
                     # Get check number if available
-                    check_num_elem = await container.query_selector('.check-number')
-                    if check_num_elem:
-                        check_num = await check_num_elem.inner_text()
-                        check_data['check_number'] = check_num
+                    if fields['check_number']:
+                        check_data['check_number'] = fields['check_number']
+                    
+                    # Collect the Nova analysis of the front image
+                    if nova_task:
+                        nova_results = await nova_task
+                    
+                    if nova_results and 'error' not in nova_results:
+                        check_data.update({
+                            'nova_analysis': nova_results,
+                            'extracted_amount': nova_results.get('amount'),
+                            'extracted_date': nova_results.get('date'),
+                            'extracted_payee': nova_results.get('payee'),
+                            'extracted_check_number': nova_results.get('check_number'),
+                            'extracted_routing_number': nova_results.get('routing_number'),
+                            'confidence_score': nova_results.get('confidence_score', 0)
+                        })
                     
                     check_images.append(check_data)
                     
@@ -173,163 +356,155 @@ class BankOfAmericaClient(FinancialClient):
                         await close_button.click()
                         await page.wait_for_selector('.check-container')
             
-            return check_images if check_images else None
+            if check_images:
+                # Image bytes are immutable, so the copy only duplicates the small dicts around them
+                self._checks_by_txid[transaction_id] = copy.deepcopy(check_images)
+                return check_images
+            return None
             
-        except Exception as e:
-            print(f"Error getting check images: {str(e)}")
+        except Exception:
+            logger.exception("Error getting check images")
             return None
 
-    async def get_transactions(self, start_date: datetime, end_date: datetime) -> List[Dict]:
-        """Get transactions from Bank of America"""
+    async def _load_transaction_list(self, page, list_url: str, start_date: datetime, end_date: datetime):
+        """Open the account's transaction list on a pooled page and apply the same date range"""
+        await page.goto(list_url)
+        await page.wait_for_selector('.transaction-list')
+        
+        date_filter = await page.query_selector('.date-filter')
+        if date_filter:
+            await date_filter.click()
+            await page.fill('.start-date', start_date.strftime("%m/%d/%Y"))
+            await page.fill('.end-date', end_date.strftime("%m/%d/%Y"))
+            await _apply_filter(page, '.apply-filter')
+
+    async def _process_deposit(self, pool: PagePool, list_url: str, start_date: datetime, end_date: datetime, transaction: Dict):
+        """Fetch, save and validate the check images for one deposit on a pooled page"""
+        async with pool.acquire() as pool_page:
+            if pool_page.url != list_url:
+                await self._load_transaction_list(pool_page, list_url, start_date, end_date)
+            check_images = await self.get_check_images(pool_page, transaction['transaction_id'])
+        
+        if check_images:
+            transaction['checks'] = check_images
+            transaction['num_checks'] = len(check_images)
+            transaction['has_check_images'] = True
+            
+            # Save check images and update paths (disk I/O, so keep it off the event loop)
+            saved_paths = await asyncio.to_thread(self.check_processor.save_check_images, transaction, 'bofa')
+            transaction['check_image_paths'] = saved_paths
+            
+            # Validate check amounts
+            amount_validation = self.check_processor.validate_check_amounts(transaction)
+            transaction['amount_validation'] = amount_validation
+            
+            # Validate confidence scores
+            confidence_validation = self.check_processor.validate_confidence_scores(transaction)
+            transaction['confidence_validation'] = confidence_validation
+            
+            # Add validation summary
+            transaction['validation_status'] = {
+                'valid': amount_validation['valid'] and confidence_validation['valid'],
+                'issues': []
+            }
+            
+            if not amount_validation['valid']:
+                transaction['validation_status']['issues'].append({
+                    'type': 'amount_mismatch',
+                    'details': amount_validation['reason']
+                })
+            
+            if not confidence_validation['valid']:
+                transaction['validation_status']['issues'].append({
+                    'type': 'low_confidence',
+                    'details': confidence_validation['reason'],
+                    'checks': confidence_validation.get('low_confidence_checks', [])
+                })
+        else:
+            transaction['has_check_images'] = False
+            transaction['num_checks'] = 0
+
+    async def _scrape_transactions(self, start_date: datetime, end_date: datetime) -> Tuple[List[Dict], bool]:
+        """Scrape transactions from Bank of America"""
         transactions = []
+        filtered = False
+        # Open a page in the shared browser, reusing this bank's session
+        context = await BrowserManager.get_context('bofa')
+        page = await context.new_page()
         try:
-            async with async_playwright() as p:
-                # Launch visible browser for testing
-                browser = await p.chromium.launch(
-                    headless=False,  # Make browser visible
-                    slow_mo=100  # Add slight delay to see actions
-                )
-                page = await browser.new_page()
-                
-                if await self.login(page):
-                    # Navigate to accounts overview
-                    await page.goto(f"{self.base_url}/myaccounts/brain/redirect.go?source=overview&target=acctDetails")
-                    await page.wait_for_selector('.account-tile')
-                    
-                    # Add delay to see the page
-                    await asyncio.sleep(2)
+            if not await self.ensure_logged_in(page):
+                raise RuntimeError("Could not sign in to Bank of America")
+            
+            # Navigate to accounts overview
+            await self._open_overview(page)
+            
+            # Find and click the correct account using last 4 digits
+            account_tiles = await page.query_selector_all('.account-tile')
+            for tile in account_tiles:
+                account_text = await tile.inner_text()
+                if self.account_number[-4:] in account_text:
+                    await tile.click()
+                    break
+            
+            # Wait for transaction list to load
+            await page.wait_for_selector('.transaction-list')
+            
+            # Set date range if available
+            date_filter = await page.query_selector('.date-filter')
+            if date_filter:
+                await date_filter.click()
+                await page.fill('.start-date', start_date.strftime("%m/%d/%Y"))
+                await page.fill('.end-date', end_date.strftime("%m/%d/%Y"))
+                await _apply_filter(page, '.apply-filter')
+                filtered = True
+            
+            # Extract transactions, reading every row's fields in a single round trip to the browser
+            deposits = []
+            rows = await page.eval_on_selector_all('.transaction-row', ROW_FIELDS_JS)
+            for row in rows:
+                if row['date'] and row['description'] and row['amount']:
+                    date = row['date']
+                    description = row['description']
+                    amount_str = row['amount'].replace('$', '').replace(',', '')
                     
-                    # Find and click the correct account using last 4 digits
-                    account_tiles = await page.query_selector_all('.account-tile')
-                    for tile in account_tiles:
-                        account_text = await tile.inner_text()
-                        if self.account_number[-4:] in account_text:
-                            await tile.click()
-                            break
+                    transaction = {
+                        'date': datetime.strptime(date, "%m/%d/%Y").strftime("%Y-%m-%d"),
+                        'description': description.strip(),
+                        'amount': float(amount_str),
+                        'source': 'bofa',
+                        'account_last4': self.account_number[-4:],
+                        'transaction_id': row['transaction_id']
+                    }
                     
-                    # Wait for transaction list to load
-                    await page.wait_for_selector('.transaction-list')
-                    await asyncio.sleep(2)  # Add delay to see transactions
+                    # If it's a check, extract the check number
+                    check_match = CHECK_NUMBER_RE.search(description)
+                    if check_match:
+                        transaction['type'] = 'check'
+                        transaction['check_number'] = check_match.group(1)
+                    else:
+                        transaction['type'] = 'other'
                     
-                    # Set date range if available
-                    date_filter = await page.query_selector('.date-filter')
-                    if date_filter:
-                        await date_filter.click()
-                        await page.fill('.start-date', start_date.strftime("%m/%d/%Y"))
-                        await page.fill('.end-date', end_date.strftime("%m/%d/%Y"))
-                        await page.click('.apply-filter')
-                        await page.wait_for_load_state('networkidle')
+                    # Deposits get their check images fetched once the row scan is done
+                    if transaction['amount'] > 0:
+                        deposits.append(transaction)
                     
-                    # Extract transactions
-                    rows = await page.query_selector_all('.transaction-row')
-                    for row in rows:
-                        date_text = await row.query_selector('.date')
-                        desc_text = await row.query_selector('.description')
-                        amount_text = await row.query_selector('.amount')
-                        
-                        if date_text and desc_text and amount_text:
-                            date = await date_text.inner_text()
-                            description = await desc_text.inner_text()
-                            amount_str = (await amount_text.inner_text()).replace('$', '').replace(',', '')
-                            transaction_id = await row.get_attribute('data-transaction-id')
-                            
-                            transaction = {
-                                'date': datetime.strptime(date, "%m/%d/%Y").strftime("%Y-%m-%d"),
-                                'description': description.strip(),
-                                'amount': float(amount_str),
-                                'type': 'check' if 'Check #' in description else 'other',
-                                'source': 'bofa',
-                                'account_last4': self.account_number[-4:],
-                                'transaction_id': transaction_id
-                            }
-                            
-                            # If it's a check, extract the check number
-                            if transaction['type'] == 'check':
-                                check_match = re.search(r'Check #(\d+)', description)
-                                if check_match:
-                                    transaction['check_number'] = check_match.group(1)
-                            
-                            # If it's a deposit, try to get check images
-                            if amount_str.startswith('+') or float(amount_str) > 0:
-                                check_images = await self.get_check_images(page, transaction_id)
-                                if check_images:
-                                    transaction['checks'] = check_images
-                                    transaction['num_checks'] = len(check_images)
-                                    transaction['has_check_images'] = True
-                                    
-                                    # Save check images and update paths
-                                    saved_paths = self.check_processor.save_check_images(transaction, 'bofa')
-                                    transaction['check_image_paths'] = saved_paths
-                                    
-                                    # Validate check amounts
-                                    amount_validation = self.check_processor.validate_check_amounts(transaction)
-                                    transaction['amount_validation'] = amount_validation
-                                    
-                                    # Validate confidence scores
-                                    confidence_validation = self.check_processor.validate_confidence_scores(transaction)
-                                    transaction['confidence_validation'] = confidence_validation
-                                    
-                                    # Add validation summary
-                                    transaction['validation_status'] = {
-                                        'valid': amount_validation['valid'] and confidence_validation['valid'],
-                                        'issues': []
-                                    }
-                                    
-                                    if not amount_validation['valid']:
-                                        transaction['validation_status']['issues'].append({
-                                            'type': 'amount_mismatch',
-                                            'details': amount_validation['reason']
-                                        })
-                                    
-                                    if not confidence_validation['valid']:
-                                        transaction['validation_status']['issues'].append({
-                                            'type': 'low_confidence',
-                                            'details': confidence_validation['reason'],
-                                            'checks': confidence_validation.get('low_confidence_checks', [])
-                                        })
-                                else:
-                                    transaction['has_check_images'] = False
-                                    transaction['num_checks'] = 0
-                            
-                            transactions.append(transaction)
-                            
-                            # Go back to transaction list if we navigated away
-                            if page.url != f"{self.base_url}/myaccounts/brain/redirect.go?source=overview&target=acctDetails":
-                                await page.go_back()
-                                await page.wait_for_selector('.transaction-list')
-                
-                await browser.close()
-        except Exception as e:
-            print(f"Error getting transactions: {str(e)}")
-        
-        return transactions
-
-    async def get_check_image(self, transaction_id: str) -> Optional[bytes]:
-        """Get check image from Bank of America"""
-        try:
-            async with async_playwright() as p:
-                # Launch visible browser for testing
-                browser = await p.chromium.launch(
-                    headless=False,  # Make browser visible
-                    slow_mo=100  # Add slight delay to see actions
-                )
-                page = await browser.new_page()
-                
-                if await self.login(page):
-                    # Navigate to check image
-                    await page.goto(f"{self.base_url}/checkimage/{transaction_id}")
-                    await page.wait_for_selector("#check-image")
-
-                    # Download image
-                    image_element = await page.query_selector("#check-image")
-                    if image_element:
-                        return await image_element.screenshot()
-                
-                await browser.close()
-        except Exception as e:
-            print(f"Error getting check image: {str(e)}")
+                    transactions.append(transaction)
+            
+            # Fetch check images for all deposits across a small pool of pages
+            if deposits:
+                list_url = page.url
+                pool = PagePool(context, CHECK_PAGE_POOL_SIZE)
+                try:
+                    await asyncio.gather(*(
+                        self._process_deposit(pool, list_url, start_date, end_date, transaction)
+                        for transaction in deposits
+                    ))
+                finally:
+                    await pool.close()
+        finally:
+            await page.close()
         
-        return None
+        return transactions, filtered
 
 class BillDotComClient(FinancialClient):
     def __init__(self):
@@ -337,6 +512,25 @@ class BillDotComClient(FinancialClient):
         if not self.api_key:
             raise ValueError("Missing required Bill.com API key in environment variables")
         self.client = Bill(api_key=self.api_key)
+        
+        # Long-lived HTTP/2 client for image downloads, carrying the SDK session's auth headers and cookies
+        self.http = httpx.AsyncClient(
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            headers=dict(self.client.session.headers),
+            cookies=self.client.session.cookies
+        )
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the HTTP client"""
+        await self.http.aclose()
     
     async def get_transactions(self, start_date: datetime, end_date: datetime) -> List[Dict]:
         """Get transactions from Bill.com"""
@@ -345,8 +539,9 @@ class BillDotComClient(FinancialClient):
             start_str = start_date.strftime("%Y-%m-%d")
             end_str = end_date.strftime("%Y-%m-%d")
             
-            # Get payments from Bill.com
-            payments = self.client.get_payments(
+            # Get payments from Bill.com (the SDK is synchronous, so keep it off the event loop)
+            payments = await asyncio.to_thread(
+                self.client.get_payments,
                 start_date=start_str,
                 end_date=end_str,
                 status="paid"
@@ -364,30 +559,36 @@ class BillDotComClient(FinancialClient):
                 })
             
             return transactions
-        except Exception as e:
-            print(f"Error getting Bill.com transactions: {str(e)}")
+        except Exception:
+            logger.exception("Error getting Bill.com transactions")
             return []
     
     async def get_check_image(self, transaction_id: str) -> Optional[bytes]:
         """Get check image from Bill.com"""
         try:
-            payment = self.client.get_payment(transaction_id)
+            payment = await asyncio.to_thread(self.client.get_payment, transaction_id)
             if payment and payment.check_image_url:
-                response = self.client.session.get(payment.check_image_url)
+                response = await self.http.get(payment.check_image_url)
                 if response.status_code == 200:
                     return response.content
             return None
-        except Exception as e:
-            print(f"Error getting Bill.com check image: {str(e)}")
+        except Exception:
+            logger.exception("Error getting Bill.com check image")
             return None
 
-class WellsFargoClient(FinancialClient):
+class WellsFargoClient(PlaywrightBankClient):
+    BANK_KEY = 'wellsfargo'
+    OVERVIEW_PATH = "/accounts/inquiry/summary"
+    CHECK_IMAGE_PATH = "/accounts/images/check/{transaction_id}"
+    CHECK_IMAGE_SELECTOR = "#check-front"
+
     def __init__(self):
-        self.username = WELLS_FARGO_USERNAME
-        self.password = WELLS_FARGO_PASSWORD
+        self.username = get_wells_fargo_username()
+        self.password = get_wells_fargo_password()
         self.account_number = WELLS_FARGO_ACCOUNT_NUMBER
         self.base_url = "https://connect.secure.wellsfargo.com"
         self.nova_client = NovaClient()
+        self.transaction_cache = TransactionCache()
         self.check_processor = CheckProcessor()
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
@@ -441,103 +642,64 @@ class WellsFargoClient(FinancialClient):
             logger.error(f"Login failed: {str(e)}")
             return False
 
-    async def get_transactions(self, start_date: datetime, end_date: datetime) -> List[Dict]:
-        """Get transactions from Wells Fargo"""
+    async def _scrape_transactions(self, start_date: datetime, end_date: datetime) -> Tuple[List[Dict], bool]:
+        """Scrape transactions from Wells Fargo"""
         transactions = []
+        # Open a page in the shared browser, reusing this bank's session
+        context = await BrowserManager.get_context('wellsfargo')
+        page = await context.new_page()
         try:
-            async with async_playwright() as p:
-                # Launch visible browser for testing
-                browser = await p.chromium.launch(
-                    headless=False,  # Make browser visible
-                    slow_mo=100  # Add slight delay to see actions
-                )
-                page = await browser.new_page()
-                
-                if await self.login(page):
-                    # Navigate to account summary
-                    await page.goto(f"{self.base_url}/accounts/inquiry/summary")
-                    await page.wait_for_selector('.account-tile')
-                    
-                    # Add delay to see the page
-                    await asyncio.sleep(2)
-                    
-                    # Find and click the correct account using last 4 digits
-                    account_tiles = await page.query_selector_all('.account-tile')
-                    for tile in account_tiles:
-                        account_text = await tile.inner_text()
-                        if self.account_number[-4:] in account_text:
-                            await tile.click()
-                            break
+            if not await self.ensure_logged_in(page):
+                raise RuntimeError("Could not sign in to Wells Fargo")
+            
+            # Navigate to account summary
+            await self._open_overview(page)
+            
+            # Find and click the correct account using last 4 digits
+            account_tiles = await page.query_selector_all('.account-tile')
+            for tile in account_tiles:
+                account_text = await tile.inner_text()
+                if self.account_number[-4:] in account_text:
+                    await tile.click()
+                    break
+            
+            # Wait for transaction list
+            await page.wait_for_selector('.transaction-list')
+            
+            # Set date range
+            await page.click('.date-range-selector')
+            await page.fill('#fromDate', start_date.strftime("%m/%d/%Y"))
+            await page.fill('#toDate', end_date.strftime("%m/%d/%Y"))
+            await _apply_filter(page, '.apply-dates')
+            
+            # Extract transactions, reading every row's fields in a single round trip to the browser
+            rows = await page.eval_on_selector_all('.transaction-row', ROW_FIELDS_JS)
+            for row in rows:
+                if row['date'] and row['description'] and row['amount']:
+                    date = row['date']
+                    description = row['description']
+                    amount_str = row['amount'].replace('$', '').replace(',', '')
                     
-                    # Wait for transaction list
-                    await page.wait_for_selector('.transaction-list')
-                    await asyncio.sleep(2)  # Add delay to see transactions
+                    transaction = {
+                        'date': datetime.strptime(date, "%m/%d/%Y").strftime("%Y-%m-%d"),
+                        'description': description.strip(),
+                        'amount': float(amount_str),
+                        'source': 'wellsfargo',
+                        'account_last4': self.account_number[-4:]
+                    }
                     
-                    # Set date range
-                    await page.click('.date-range-selector')
-                    await page.fill('#fromDate', start_date.strftime("%m/%d/%Y"))
-                    await page.fill('#toDate', end_date.strftime("%m/%d/%Y"))
-                    await page.click('.apply-dates')
-                    await page.wait_for_load_state('networkidle')
+                    # If it's a check, extract the check number
+                    check_match = CHECK_NUMBER_RE.search(description)
+                    if check_match:
+                        transaction['type'] = 'check'
+                        transaction['check_number'] = check_match.group(1)
+                    else:
+                        transaction['type'] = 'other'
                     
-                    # Extract transactions
-                    rows = await page.query_selector_all('.transaction-row')
-                    for row in rows:
-                        date_text = await row.query_selector('.date')
-                        desc_text = await row.query_selector('.description')
-                        amount_text = await row.query_selector('.amount')
-                        
-                        if date_text and desc_text and amount_text:
-                            date = await date_text.inner_text()
-                            description = await desc_text.inner_text()
-                            amount_str = (await amount_text.inner_text()).replace('$', '').replace(',', '')
-                            
-                            transaction = {
-                                'date': datetime.strptime(date, "%m/%d/%Y").strftime("%Y-%m-%d"),
-                                'description': description.strip(),
-                                'amount': float(amount_str),
-                                'type': 'check' if 'Check #' in description else 'other',
-                                'source': 'wellsfargo',
-                                'account_last4': self.account_number[-4:]
-                            }
-                            
-                            # If it's a check, extract the check number
-                            if transaction['type'] == 'check':
-                                check_match = re.search(r'Check #(\d+)', description)
-                                if check_match:
-                                    transaction['check_number'] = check_match.group(1)
-                            
-                            transactions.append(transaction)
-                
-                await browser.close()
-        except Exception as e:
-            print(f"Error getting transactions: {str(e)}")
+                    transactions.append(transaction)
+        finally:
+            await page.close()
         
-        return transactions
+        # The date range is always applied (the clicks above raise if the controls are missing)
+        return transactions, True
 
-    async def get_check_image(self, transaction_id: str) -> Optional[bytes]:
-        """Get check image from Wells Fargo"""
-        try:
-            async with async_playwright() as p:
-                # Launch visible browser for testing
-                browser = await p.chromium.launch(
-                    headless=False,  # Make browser visible
-                    slow_mo=100  # Add slight delay to see actions
-                )
-                page = await browser.new_page()
-                
-                if await self.login(page):
-                    # Navigate to check image
-                    await page.goto(f"{self.base_url}/accounts/images/check/{transaction_id}")
-                    await page.wait_for_selector("#check-front")
-
-                    # Download image
-                    image_element = await page.query_selector("#check-front")
-                    if image_element:
-                        return await image_element.screenshot()
-                
-                await browser.close()
-        except Exception as e:
-            print(f"Error getting check image: {str(e)}")
-        
-        return None
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Location and size limit of the on-disk Nova result cache
+CACHE_PATH = os.getenv('NOVA_CACHE_PATH', os.path.join('cache', 'nova_cache.sqlite3'))
+CACHE_MAX_BYTES = int(os.getenv('NOVA_CACHE_MAX_BYTES', str(1024 ** 3)))
+
+class NovaCache:
+    """On-disk cache of Nova analysis results keyed by the SHA-256 of the analysed bytes"""
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS nova_results ("
+            "hash BLOB PRIMARY KEY, json BLOB NOT NULL, ts INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS nova_results_ts ON nova_results (ts)")
+        self._conn.commit()
+
+        # Size of all stored results, scanned once here and then kept up to date by put and _evict
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(json)), 0) FROM nova_results"
+        ).fetchone()[0]
+        # Keys read since the last write, whose last-used time is updated with the next write
+        self._touched = set()
+        # The cache is called from worker threads, which must not share the connection at once
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes) -> bytes:
+        """Cache key for a piece of content"""
+        return hashlib.sha256(data).digest()
+
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Return the cached result for a key, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute("SELECT json FROM nova_results WHERE hash = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            # Mark the entry as recently used so eviction keeps it; written with the next put
+            self._touched.add(key)
+        return json.loads(row[0])
+
+    def put(self, key: bytes, result: Dict):
+        """Store a result and evict the least recently used entries if the cache is over its limit"""
+        data = json.dumps(result).encode('utf-8')
+        with self._lock:
+            previous = self._conn.execute("SELECT LENGTH(json) FROM nova_results WHERE hash = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO nova_results (hash, json, ts) VALUES (?, ?, ?)",
+                (key, data, int(time.time()))
+            )
+            self._total_bytes += len(data) - (previous[0] if previous else 0)
+            self._touched.discard(key)
+            self._write_touched()
+            self._evict()
+            self._conn.commit()
+
+    def _write_touched(self):
+        """Record the last-used time of entries read since the previous write"""
+        if self._touched:
+            now = int(time.time())
+            self._conn.executemany(
+                "UPDATE nova_results SET ts = ? WHERE hash = ?",
+                [(now, key) for key in self._touched]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        excess = self._total_bytes - self.max_bytes
+        if excess <= 0:
+            return
+
+        rows = self._conn.execute("SELECT hash, LENGTH(json) FROM nova_results ORDER BY ts").fetchall()
+        for key, size in rows:
+            if excess <= 0:
+                break
+            self._conn.execute("DELETE FROM nova_results WHERE hash = ?", (key,))
+            excess -= size
+            self._total_bytes -= size
+        logger.debug("Evicted old entries from the Nova cache")
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+            self._conn.close()
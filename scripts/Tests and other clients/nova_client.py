@@ -1,25 +1,166 @@
-import boto3
 import base64
 import json
-from typing import Dict, Optional
+import orjson
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 import logging
 import os
 import time
 import asyncio
+import re
+import threading
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from .nova_cache import NovaCache
+
+if TYPE_CHECKING:
+    import boto3
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+# Keep connections to the Bedrock runtime alive between invocations, and back off
+# client-side (adaptive mode) rather than retrying straight into throttling
+# (botocore Config options, applied when the runtime client is created)
+RUNTIME_CONFIG = dict(
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=5,
+    read_timeout=60
+)
+
+def _encode_bytes(obj):
+    """orjson default hook that base64-encodes raw image bytes while the body is serialised"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode('ascii')
+    raise TypeError
+
+# Image formats accepted by the Converse API, by file signature
+_IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF8', 'gif'),
+    (b'RIFF', 'webp'),
+)
+
+def _image_format(data: bytes) -> str:
+    """Converse image format for raw image bytes, defaulting to jpeg"""
+    for signature, image_format in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return image_format
+    return 'jpeg'
+
+# Number words used in the written amount line of a check
+_NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
+    'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18,
+    'nineteen': 19, 'twenty': 20, 'thirty': 30, 'forty': 40, 'fourty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90
+}
+_SCALE_WORDS = {'thousand': 1000, 'million': 1000000}
+_FILLER_WORDS = {'and', 'dollars', 'dollar', 'only', 'no', 'cents', 'xx'}
+_CENTS_RE = re.compile(r'(\d{1,2}|xx|no)\s*/\s*100', re.IGNORECASE)
+
+def _written_amount_value(written) -> Optional[float]:
+    """Parse a check's written amount (e.g. "Five hundred forty and 25/100"), or None if it can't be read"""
+    if not isinstance(written, str):
+        return None
+    text = written.lower()
+    
+    cents = 0
+    cents_match = _CENTS_RE.search(text)
+    if cents_match:
+        if cents_match.group(1).isdigit():
+            cents = int(cents_match.group(1))
+        text = text[:cents_match.start()] + text[cents_match.end():]
+    
+    total = 0
+    current = 0
+    seen_number = False
+    for word in re.split(r'[\s,-]+', text):
+        if not word or word in _FILLER_WORDS:
+            continue
+        if word in _NUMBER_WORDS:
+            current += _NUMBER_WORDS[word]
+        elif word == 'hundred':
+            current = (current or 1) * 100
+        elif word in _SCALE_WORDS:
+            total += (current or 1) * _SCALE_WORDS[word]
+            current = 0
+        else:
+            return None
+        seen_number = True
+    
+    if not seen_number:
+        return None
+    return total + current + cents / 100
+
+def _amounts_agree(amount) -> bool:
+    """Whether a check's numerical and written amounts agree to the cent"""
+    if not isinstance(amount, dict):
+        return False
+    try:
+        numerical = float(str(amount.get('Numerical', '')).replace('$', '').replace(',', '').strip())
+    except ValueError:
+        return False
+    written = _written_amount_value(amount.get('Written'))
+    return written is not None and abs(written - numerical) < 0.01
+
+# Maximum number of check analyses sent to Bedrock at once
+NOVA_MAX_CONCURRENCY = int(os.getenv('NOVA_MAX_CONCURRENCY', '8'))
+
+# Role assumed for Bedrock access; its credentials and clients are shared by every Nova client
+BEDROCK_ROLE_ARN = 'arn:aws:iam::664604937404:role/BedrockAccessRole'
+# Refresh the assumed role this long before its credentials expire
+CREDENTIAL_REFRESH_MARGIN = timedelta(minutes=5)
+
+_SHARED_SESSION: Optional['boto3.Session'] = None
+_SHARED_CLIENTS: Optional[Tuple[Dict, object, object]] = None
+_SHARED_LOCK = threading.Lock()
+
+def _get_shared_clients() -> Tuple[Dict, object, object]:
+    """Return (credentials, bedrock, runtime) for the assumed role, assuming it only once until it nears expiry"""
+    global _SHARED_SESSION, _SHARED_CLIENTS
+    # boto3 and botocore are slow to import, so they're only loaded once AWS is actually needed
+    import boto3
+    from botocore.config import Config
+    
+    with _SHARED_LOCK:
+        if _SHARED_CLIENTS is not None:
+            expiration = _SHARED_CLIENTS[0]['Expiration']
+            if expiration - datetime.now(timezone.utc) > CREDENTIAL_REFRESH_MARGIN:
+                return _SHARED_CLIENTS
+        
+        role = boto3.client('sts').assume_role(
+            RoleArn=BEDROCK_ROLE_ARN,
+            RoleSessionName='BedrockSession'
+        )
+        credentials = role['Credentials']
+        
+        _SHARED_SESSION = boto3.Session(
+            aws_access_key_id=credentials['AccessKeyId'],
+            aws_secret_access_key=credentials['SecretAccessKey'],
+            aws_session_token=credentials['SessionToken'],
+            region_name='us-west-2'
+        )
+        _SHARED_CLIENTS = (
+            credentials,
+            _SHARED_SESSION.client('bedrock'),
+            _SHARED_SESSION.client('bedrock-runtime', config=Config(**RUNTIME_CONFIG))
+        )
+        logger.debug("Assumed Bedrock role and created shared AWS clients")
+        return _SHARED_CLIENTS
 
 class NovaBaseClient:
     def __init__(self):
         load_dotenv()
         self.bedrock = None
         self.runtime = None
+        self.credentials = None
         
     async def initialize(self):
         """Initialize AWS clients asynchronously"""
@@ -27,34 +168,7 @@ class NovaBaseClient:
             return
             
         try:
-            # Create STS client
-            sts_client = boto3.client('sts')
-            
-            # Assume role for Bedrock access
-            role = sts_client.assume_role(
-                RoleArn='arn:aws:iam::664604937404:role/BedrockAccessRole',
-                RoleSessionName='BedrockSession'
-            )
-            
-            # Get temporary credentials
-            credentials = role['Credentials']
-            
-            # Create Bedrock clients with assumed role credentials
-            self.bedrock = boto3.client(
-                'bedrock',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken'],
-                region_name='us-west-2'
-            )
-            
-            self.runtime = boto3.client(
-                'bedrock-runtime',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken'],
-                region_name='us-west-2'
-            )
+            self.credentials, self.bedrock, self.runtime = _get_shared_clients()
             
             logger.debug("AWS clients initialized with assumed role")
             
@@ -72,9 +186,10 @@ class NovaLiteClient(NovaBaseClient):
         """Analyze a check image using Nova Lite"""
         try:
             # First attempt - basic analysis
-            response = self.runtime.invoke_model(
+            response = await asyncio.to_thread(
+                self.runtime.invoke_model,
                 modelId=self.MODEL_ID,
-                body=json.dumps({
+                body=orjson.dumps({
                     **request,
                     "instructions": """
                     Please analyze this check image with extra attention to accuracy:
@@ -92,19 +207,25 @@ class NovaLiteClient(NovaBaseClient):
                     - Amount Confidence: HIGH if numerical and written amounts match, LOW if they don't
                     - Additional Review Required: Yes if amounts don't match or other issues found
                     """
-                })
+                }, default=_encode_bytes)
             )
             
             if response:
-                model_response = json.loads(response["body"].read())
-                result = json.loads(model_response['output']['message']['content'][0]['text'].strip('```json\n').strip('```'))
+                model_response = orjson.loads(response["body"].read())
+                result = orjson.loads(model_response['output']['message']['content'][0]['text'].strip('```json\n').strip('```'))
+                
+                # The model often flags amounts that agree once the written amount is parsed; check locally first
+                if result.get('Amount Confidence') == 'LOW' and _amounts_agree(result.get('Amount')):
+                    logger.info("Written and numerical amounts agree, skipping second analysis")
+                    result['Amount Confidence'] = 'HIGH'
                 
                 # If amounts don't match or confidence is low, try a second analysis
                 if result.get('Amount Confidence') == 'LOW':
                     logger.info("Amount mismatch detected, performing second analysis...")
-                    response = self.runtime.invoke_model(
+                    response = await asyncio.to_thread(
+                        self.runtime.invoke_model,
                         modelId=self.MODEL_ID,
-                        body=json.dumps({
+                        body=orjson.dumps({
                             **request,
                             "instructions": f"""
                             Please carefully reanalyze this check image, focusing specifically on the amount.
@@ -120,18 +241,18 @@ class NovaLiteClient(NovaBaseClient):
                             
                             Return the same JSON format with your highest confidence analysis.
                             """
-                        })
+                        }, default=_encode_bytes)
                     )
                     
                     if response:
-                        second_response = json.loads(response["body"].read())
-                        second_result = json.loads(second_response['output']['message']['content'][0]['text'].strip('```json\n').strip('```'))
+                        second_response = orjson.loads(response["body"].read())
+                        second_result = orjson.loads(second_response['output']['message']['content'][0]['text'].strip('```json\n').strip('```'))
                         
                         # Use the result with higher confidence
                         if second_result.get('Amount Confidence') == 'HIGH':
                             result = second_result
                 
-                return json.dumps(result, indent=2)
+                return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
                 
         except Exception as e:
             logger.error(f"Error in analyze_check_image: {str(e)}")
@@ -143,31 +264,28 @@ class NovaProClient(NovaBaseClient):
     def __init__(self):
         super().__init__()
         
-    async def match_data(self, request: Dict) -> str:
-        """Match data using Nova Pro"""
-        try:
-            logger.debug(f"Sending request to Nova Pro with model ID: {self.MODEL_ID}")
-            
-            # Format the data for Nova Pro
-            checks_str = json.dumps(request['checks'], indent=2)
-            invoices_str = json.dumps(request['invoices'], indent=2)
-            bank_data_str = request.get('bank_data', '')
-            
-            # Create system prompt for consistent matching behavior
-            system = [{
-                "text": """You are an expert at matching payment data. Follow these rules:
+    def _build_match_request(self, request: Dict) -> tuple:
+        """Build the system prompt, messages and inference config for a match request"""
+        # Format the data for Nova Pro
+        checks_str = orjson.dumps(request['checks'], option=orjson.OPT_INDENT_2).decode()
+        invoices_str = orjson.dumps(request['invoices'], option=orjson.OPT_INDENT_2).decode()
+        bank_data_str = request.get('bank_data', '')
+        
+        # Create system prompt for consistent matching behavior
+        system = [{
+            "text": """You are an expert at matching payment data. Follow these rules:
                 1. Name Matching: Compare first/last names, consider variations (e.g. Bob/Robert)
                 2. Amount Matching: Exact matches are HIGH confidence, within $50 is MEDIUM
                 3. Date Matching: Same month increases confidence, >1 month apart decreases it
                 4. Flag close matches (within $50) for manual review"""
-            }]
-            
-            # Create messages for the request
-            messages = [{
-                "role": "user",
-                "content": [
-                    {
-                        "text": f"""Match these payments and return ONLY a JSON array of matches:
+        }]
+        
+        # Create messages for the request
+        messages = [{
+            "role": "user",
+            "content": [
+                {
+                    "text": f"""Match these payments and return ONLY a JSON array of matches:
 
 1. Check Data:
 {checks_str}
@@ -187,19 +305,31 @@ Format: [
     "notes": "any relevant notes"
   }}
 ]"""
-                    }
-                ]
-            }]
-            
-            # Set inference parameters
-            inference_config = {
-                "maxTokens": 2000,
-                "temperature": 0.1,
-                "topP": 0.9
-            }
+                }
+            ]
+        }]
+        
+        # Set inference parameters
+        inference_config = {
+            "maxTokens": 2000,
+            "temperature": 0.1,
+            "topP": 0.9
+        }
+        
+        return system, messages, inference_config
+        
+    async def match_data(self, request: Dict) -> str:
+        """Match data using Nova Pro"""
+        try:
+            logger.debug(f"Sending request to Nova Pro with model ID: {self.MODEL_ID}")
+            system, messages, inference_config = self._build_match_request(request)
             
-            logger.debug("Request size: %d bytes", len(json.dumps(messages)))
-            response = self.runtime.converse(
+            # Serializing the request and response just to log them is only worth doing when they're logged
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("Request size: %d bytes", len(orjson.dumps(messages)))
+            response = await asyncio.to_thread(
+                self.runtime.converse,
                 modelId=self.MODEL_ID,
                 messages=messages,
                 system=system,
@@ -208,13 +338,19 @@ Format: [
             
             if response:
                 logger.debug("Got response from Nova Pro")
-                logger.debug(f"Response: {json.dumps(response, indent=2)}")
+                if debug:
+                    logger.debug("Response: %s", json.dumps(response, indent=2, default=str))
                 return response["output"]["message"]["content"][0]["text"]
                 
         except Exception as e:
             logger.error(f"Error in match_data: {str(e)}")
             raise
 
+    async def converse(self, request: Dict) -> str:
+        """Send a prebuilt Converse request (messages and optional system/inferenceConfig) and return the reply text"""
+        response = await asyncio.to_thread(self.runtime.converse, modelId=self.MODEL_ID, **request)
+        return response["output"]["message"]["content"][0]["text"]
+
 class NovaClient:
     # Nova Pro profile ARN
     NOVA_PRO_PROFILE = "us.amazon.nova-pro-v1:0"
@@ -225,6 +361,10 @@ class NovaClient:
         self.runtime = None
         self.nova_pro_client = NovaProClient()
         self.nova_lite_client = NovaLiteClient()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        # Analyses of previously seen check images, kept on disk across runs
+        self.cache = NovaCache()
     
     async def initialize(self):
         """Initialize AWS clients asynchronously"""
@@ -232,35 +372,7 @@ class NovaClient:
             return
             
         try:
-            # Create STS client
-            sts_client = boto3.client('sts')
-            
-            # Assume role for Bedrock access
-            role = sts_client.assume_role(
-                RoleArn='arn:aws:iam::664604937404:role/BedrockAccessRole',
-                RoleSessionName='BedrockSession'
-            )
-            
-            # Get temporary credentials
-            credentials = role['Credentials']
-            
-            # Create Bedrock client with assumed role credentials
-            self.bedrock = boto3.client(
-                'bedrock',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken'],
-                region_name='us-west-2'
-            )
-            
-            # Create Bedrock Runtime client
-            self.runtime = boto3.client(
-                'bedrock-runtime',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken'],
-                region_name='us-west-2'
-            )
+            _, self.bedrock, self.runtime = _get_shared_clients()
             
             await self.nova_pro_client.initialize()
             await self.nova_lite_client.initialize()
@@ -271,33 +383,54 @@ class NovaClient:
             logger.error(f"Error initializing AWS clients: {e}")
             raise
 
-    async def analyze_check_image(self, check_id: str, image_b64: str) -> Dict:
+    def _dispatch_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore limiting in-flight check analyses, recreated when used from a new event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(NOVA_MAX_CONCURRENCY)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def analyze_check_image(self, check_id: str, image_bytes: bytes) -> Dict:
         """
         Analyze a check image using Nova Pro
         Args:
             check_id: Unique identifier for the check
-            image_b64: Base64 encoded check image
+            image_bytes: Raw check image (JPEG, PNG, GIF or WebP)
         Returns:
             Dictionary containing analysis results
         """
+        # Identical images (re-runs, duplicate deposits) reuse their earlier analysis
+        cache_key = NovaCache.key(image_bytes)
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            return cached
+        
         await self.initialize()  # Ensure clients are initialized
         try:
-            # Create request body
+            # Send the image as an image block so the model's vision encoder reads it
             request_body = {
                 "messages": [
                     {
                         "role": "user",
                         "content": [
                             {
-                                "text": "Please analyze this check image and extract the following information: payee name, amount, date, memo line, and check number.\n\n[Image Data: " + image_b64 + "]"
+                                "image": {
+                                    "format": _image_format(image_bytes),
+                                    "source": {"bytes": image_bytes}
+                                }
+                            },
+                            {
+                                "text": "Please analyze this check image and extract the following information: payee name, amount, date, memo line, and check number."
                             }
                         ]
                     }
                 ]
             }
             
-            # Make synchronous call
-            response = await self.nova_pro_client.match_data(request_body)
+            # Each analysis is sent on its own, with a cap on how many are in flight
+            async with self._dispatch_semaphore():
+                response = await self.nova_pro_client.converse(request_body)
             
             try:
                 # Parse the content into our expected format
@@ -307,6 +440,7 @@ class NovaClient:
                     'content': content
                 }
                 
+                await asyncio.to_thread(self.cache.put, cache_key, parsed_result)
                 return parsed_result
                 
             except Exception as e:
@@ -341,8 +475,8 @@ class NovaClient:
                 statement_data = f.read()
                 
             # Load billing data
-            with open(billing_json, 'r') as f:
-                billing_data = json.load(f)
+            with open(billing_json, 'rb') as f:
+                billing_data = orjson.loads(f.read())
                 
             # Create request body
             request_body = {
@@ -367,7 +501,7 @@ class NovaClient:
                         "role": "user",
                         "content": [
                             {
-                                "text": f"Please analyze the bank statement and billing data to match payments to invoices.\n\nBilling Data:\n{json.dumps(billing_data, indent=2)}\n\nPlease provide a CSV with the following columns:\nInvoice Number,Invoice Amount,Resident Name,Payment Amount,Deposit Date,Needs Review"
+                                "text": f"Please analyze the bank statement and billing data to match payments to invoices.\n\nBilling Data:\n{orjson.dumps(billing_data, option=orjson.OPT_INDENT_2).decode()}\n\nPlease provide a CSV with the following columns:\nInvoice Number,Invoice Amount,Resident Name,Payment Amount,Deposit Date,Needs Review"
                             }
                         ]
                     }
@@ -9,13 +9,11 @@ sys.path.append(project_root)
 
 from src.llama_client import LlamaClient
 
-async def test_text():
-    client = LlamaClient()
+async def test_text(client: LlamaClient):
     response = await client.process_text("What is 2+2?")
     print("\nText Response:", response)
 
-async def test_vision():
-    client = LlamaClient()
+async def test_vision(client: LlamaClient):
     # Assuming you have a check image in your payment_matching folder
     test_pdf = Path("C:/Users/aaron/Downloads/payment_matching_20241228/44.pdf")
     if not test_pdf.exists():
@@ -45,8 +43,10 @@ async def test_vision():
             test_image.unlink()
 
 async def main():
-    await test_text()
-    await test_vision()
+    # One client (and HTTP session) for both tests, closed when they finish
+    async with LlamaClient() as client:
+        await test_text(client)
+        await test_vision(client)
 
 if __name__ == "__main__":
     asyncio.run(main())
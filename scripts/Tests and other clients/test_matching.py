@@ -60,8 +60,6 @@ TEST_INVOICE_DATA = [
 async def test_matching():
     """Test the check matching logic."""
     try:
-        llama = LlamaClient()
-        
         # Prepare the matching prompt
         prompt = """You are a JSON-only API that matches checks with invoices. Return ONLY a JSON object, no other text.
 
@@ -112,8 +110,9 @@ Return this exact JSON structure (no other text):
             invoice_data=json.dumps(TEST_INVOICE_DATA, indent=2)
         )
 
-        # Get response from Llama
-        text_response = await llama.process_text(formatted_prompt)
+        # Get response from Llama, closing the client's HTTP session afterwards
+        async with LlamaClient() as llama:
+            text_response = await llama.process_text(formatted_prompt)
         logger.info(f"Raw response:\n{text_response}")
 
         # Extract JSON from response
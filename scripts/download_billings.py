@@ -17,9 +17,6 @@ load_dotenv()
 
 async def main(target_folder=None):
     try:
-        # Initialize Knack client
-        knack_client = KnackClient()
-        
         # Use provided folder or create one in Downloads
         if target_folder:
             folder_path = target_folder
@@ -33,7 +30,8 @@ async def main(target_folder=None):
         
         # Get unpaid approved billings
         print("Fetching unpaid approved billings...")
-        billings = await knack_client.get_unpaid_approved_billings()
+        async with KnackClient() as knack_client:
+            billings = await knack_client.get_unpaid_approved_billings()
         
         # Create filename
         current_date = datetime.now().strftime("%Y%m%d")
@@ -58,4 +56,10 @@ async def main(target_folder=None):
         print(f"Error downloading billings: {str(e)}")
 
 if __name__ == "__main__":
+    # Use uvloop's faster event loop where it's installed (it isn't available on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -1,6 +1,9 @@
 from typing import List, Dict, Tuple
 from scripts.process_payments_llama import match_checks_with_invoices as llama_match
 
+# Only invoices within this fraction of a check's amount are offered as matches
+AMOUNT_TOLERANCE = 0.05
+
 def match_payments(check_data: List[Dict], billing_data: List[Dict]) -> List[Dict]:
     """
     Match payments with billing data using the Llama-based matching logic.
@@ -12,5 +15,5 @@ def match_payments(check_data: List[Dict], billing_data: List[Dict]) -> List[Dic
     Returns:
         List of potential matches for each check
     """
-    matches, _, _ = llama_match(check_data, billing_data)
+    matches, _, _ = llama_match(check_data, billing_data, amount_tolerance=AMOUNT_TOLERANCE)
     return matches
@@ -346,8 +346,8 @@ async def process_input_folder(folder_path: str) -> Dict:
             
         # Get billing data from Knack
         logger.info("Getting billing data from Knack...")
-        knack = KnackClient()
-        invoice_data = await knack.get_unpaid_approved_billings()
+        async with KnackClient() as knack:
+            invoice_data = await knack.get_unpaid_approved_billings()
         if not invoice_data:
             logger.error("No invoice data found")
             return
@@ -394,6 +394,37 @@ async def process_input_folder(folder_path: str) -> Dict:
         logger.error(f"Error in process_input_folder: {str(e)}")
         raise
 
+def _load_and_normalize_billing(billing_file: str) -> tuple:
+    """Load Knack billing download data and parse each invoice into our format
+    Returns (invoice_data, parsed_invoices)"""
+    with open(billing_file, 'r') as f:
+        invoice_data = json.load(f)
+        
+    parsed_invoices = []
+    for invoice in invoice_data:
+        try:
+            # Extract amount from field_2349 (e.g. "$5,500.00")
+            amount_str = invoice.get('field_2349', '0').replace('$', '').replace(',', '')
+            amount = float(amount_str)
+            
+            # Get payee name from field_1350 (removing HTML tags)
+            payee = invoice.get('field_1350', '').replace('<span class="', '').split('">')[1].split('</span>')[0]
+            
+            parsed_invoice = {
+                'invoice_number': invoice.get('field_1418', ''),
+                'amount': amount,
+                'date': invoice.get('field_1351', ''),
+                'payee': payee,
+                'resident_name': invoice.get('field_2540', ''),  # Adding resident name field
+                'raw_payee': invoice.get('field_1350', '')  # Adding raw payee field for debugging
+            }
+            parsed_invoices.append(parsed_invoice)
+        except Exception as e:
+            logger.error(f"Error parsing invoice data: {str(e)}")
+            continue
+            
+    return invoice_data, parsed_invoices
+
 async def get_input_folder() -> str:
     """Get input folder path using GUI"""
     logger.info("Creating root window...")
@@ -425,19 +456,7 @@ async def main():
             logger.error("No folder selected")
             return
             
-        # Process all PDFs in the folder
-        pdf_files = [f for f in os.listdir(folder_path) if f.endswith('.pdf')]
-        check_results = []
-        
-        for pdf_file in pdf_files:
-            pdf_path = os.path.join(folder_path, pdf_file)
-            logger.info(f"Processing check: {pdf_file}")
-            
-            result = await analyze_check_image(nova_lite, pdf_path)
-            if result:
-                check_results.append(result)
-        
-        # Find and load Knack billing download data
+        # Find Knack billing download data
         billing_files = [f for f in os.listdir(folder_path) if f.startswith('billing_download') and f.endswith('.json')]
         if not billing_files:
             logger.error("No billing_download*.json file found in the selected folder")
@@ -451,32 +470,22 @@ async def main():
         billing_file = os.path.join(folder_path, billing_files[0])
         logger.info(f"Using Knack billing data from: {billing_files[0]}")
         
-        with open(billing_file, 'r') as f:
-            invoice_data = json.load(f)
+        # Load and parse billing data in the background while the checks are analyzed
+        billing_task = asyncio.create_task(asyncio.to_thread(_load_and_normalize_billing, billing_file))
+        
+        # Process all PDFs in the folder
+        pdf_files = [f for f in os.listdir(folder_path) if f.endswith('.pdf')]
+        check_results = []
+        
+        for pdf_file in pdf_files:
+            pdf_path = os.path.join(folder_path, pdf_file)
+            logger.info(f"Processing check: {pdf_file}")
             
-        # Save parsed invoice data for debugging
-        parsed_invoices = []
-        for invoice in invoice_data:
-            try:
-                # Extract amount from field_2349 (e.g. "$5,500.00")
-                amount_str = invoice.get('field_2349', '0').replace('$', '').replace(',', '')
-                amount = float(amount_str)
-                
-                # Get payee name from field_1350 (removing HTML tags)
-                payee = invoice.get('field_1350', '').replace('<span class="', '').split('">')[1].split('</span>')[0]
-                
-                parsed_invoice = {
-                    'invoice_number': invoice.get('field_1418', ''),
-                    'amount': amount,
-                    'date': invoice.get('field_1351', ''),
-                    'payee': payee,
-                    'resident_name': invoice.get('field_2540', ''),  # Adding resident name field
-                    'raw_payee': invoice.get('field_1350', '')  # Adding raw payee field for debugging
-                }
-                parsed_invoices.append(parsed_invoice)
-            except Exception as e:
-                logger.error(f"Error parsing invoice data: {str(e)}")
-                continue
+            result = await analyze_check_image(nova_lite, pdf_path)
+            if result:
+                check_results.append(result)
+        
+        invoice_data, parsed_invoices = await billing_task
                 
         # Save parsed data for debugging
         debug_data = {
@@ -606,4 +615,10 @@ async def main():
         logger.error(f"Error in main: {str(e)}", exc_info=True)
 
 if __name__ == "__main__":
+    # Use uvloop's faster event loop where it's installed (it isn't available on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
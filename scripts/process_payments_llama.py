@@ -8,6 +8,7 @@ import glob
 import re
 import fitz  # PyMuPDF
 import random
+from bisect import bisect_left, bisect_right
 from Levenshtein import distance as Levenshtein_distance
 from typing import Optional, Dict
 import tkinter as tk
@@ -197,7 +198,7 @@ def name_similarity(name1: str, name2: str) -> float:
         return len(common_words) / len(total_words)
         
     except Exception as e:
-        logger.error(f"Error calculating name similarity: {str(e)}")
+        logger.error("Error calculating name similarity: %s", e)
         return 0.0
 
 def normalize_amount(amount_str: str) -> float:
@@ -207,43 +208,55 @@ def normalize_amount(amount_str: str) -> float:
         amount = amount_str.replace('$', '').replace(',', '')
         return float(amount)
     except (ValueError, AttributeError) as e:
-        logger.error(f"Error normalizing amount {amount_str}: {str(e)}")
+        logger.error("Error normalizing amount %s: %s", amount_str, e)
         return 0.0
 
-def get_date_score(date1_str: str, date2_str: str) -> float:
-    """Calculate similarity score between two dates"""
+def date_to_day(date_str: str) -> Optional[int]:
+    """Convert an MM/DD/YYYY date string to a day number, or None if it can't be parsed"""
+    if not date_str:
+        return None
     try:
-        if not date1_str or not date2_str:
-            return 0.0
-            
-        date1 = datetime.strptime(date1_str, '%m/%d/%Y')
-        date2 = datetime.strptime(date2_str, '%m/%d/%Y')
-        
-        # Calculate days difference
-        days_diff = abs((date2 - date1).days)
-        
-        # Score decreases as days difference increases
-        # Perfect score (1.0) if same day
-        # 0.9 if within a week
-        # 0.8 if within a month
-        # 0.0 if more than 3 months
-        if days_diff == 0:
-            return 1.0
-        elif days_diff <= 7:
-            return 0.9
-        elif days_diff <= 30:
-            return 0.8
-        elif days_diff <= 90:
-            return 0.5
-        else:
-            return 0.0
-            
+        return datetime.strptime(date_str, '%m/%d/%Y').toordinal()
     except (ValueError, TypeError) as e:
-        logger.error(f"Error calculating date score: {str(e)}")
+        logger.error("Error calculating date score: %s", e)
+        return None
+
+def get_date_score_days(day1: Optional[int], day2: Optional[int]) -> float:
+    """Calculate similarity score between two day numbers from date_to_day"""
+    if day1 is None or day2 is None:
+        return 0.0
+    
+    # Calculate days difference
+    days_diff = abs(day2 - day1)
+    
+    # Score decreases as days difference increases
+    # Perfect score (1.0) if same day
+    # 0.9 if within a week
+    # 0.8 if within a month
+    # 0.0 if more than 3 months
+    if days_diff == 0:
+        return 1.0
+    elif days_diff <= 7:
+        return 0.9
+    elif days_diff <= 30:
+        return 0.8
+    elif days_diff <= 90:
+        return 0.5
+    else:
         return 0.0
 
+def get_date_score(date1_str: str, date2_str: str) -> float:
+    """Calculate similarity score between two dates"""
+    if not date1_str or not date2_str:
+        return 0.0
+    return get_date_score_days(date_to_day(date1_str), date_to_day(date2_str))
+
 def is_match(check: dict, invoice: dict) -> float:
     """Determine if a check matches an invoice"""
+    return _score_match(check, invoice, date_to_day(check.get('date')), date_to_day(invoice.get('date')))
+
+def _score_match(check: dict, invoice: dict, check_day: Optional[int], invoice_day: Optional[int]) -> float:
+    """Score a check against an invoice using dates already converted with date_to_day"""
     try:
         # Convert amounts to float for comparison
         check_amount = normalize_amount(check['amount'])
@@ -254,7 +267,7 @@ def is_match(check: dict, invoice: dict) -> float:
         amount_score = 1.0 if amount_diff == 0 else max(0, 1.0 - (amount_diff / max(check_amount, invoice_amount)))
         
         # Calculate date similarity (0-1)
-        date_score = get_date_score(check['date'], invoice['date'])
+        date_score = get_date_score_days(check_day, invoice_day)
         
         # Calculate name similarity (0-1)
         from_name = normalize_name(check['from'])
@@ -282,12 +295,14 @@ def is_match(check: dict, invoice: dict) -> float:
         return total_score
         
     except Exception as e:
-        logger.error(f"Error comparing check and invoice: {str(e)}")
+        logger.error("Error comparing check and invoice: %s", e)
         return 0.0
 
-def match_checks_with_invoices(checks: list, invoices: list) -> tuple:
+def match_checks_with_invoices(checks: list, invoices: list, amount_tolerance: Optional[float] = None) -> tuple:
     """
     Match checks with invoices using fuzzy matching
+    If amount_tolerance is given (e.g. 0.05 for 5%), only invoices whose amount
+    is within that fraction of the check amount are scored
     Returns (matches, unmatched_checks, unmatched_invoices)
     """
     # Convert Knack billing data to our format
@@ -326,19 +341,38 @@ def match_checks_with_invoices(checks: list, invoices: list) -> tuple:
                 'original_data': invoice  # Keep original data for reference
             })
         except (ValueError, KeyError) as e:
-            logger.warning(f"Error processing invoice {invoice.get('field_1418', 'N/A')}: {str(e)}")
+            logger.warning("Error processing invoice %s: %s", invoice.get('field_1418', 'N/A'), e)
             continue
 
+    # Convert invoice dates once instead of parsing them for every check
+    invoice_days = [date_to_day(invoice['date']) for invoice in formatted_invoices]
+    
+    # Sort invoices by amount so candidates can be looked up with bisect
+    if amount_tolerance is not None:
+        amount_index = sorted(
+            (normalize_amount(invoice['amount']), i) for i, invoice in enumerate(formatted_invoices)
+        )
+        sorted_amounts = [amount for amount, _ in amount_index]
+    
     # For each check, find all potential matches sorted by score
     matches = []
     unmatched_checks = []
     matched_invoices = set()
     
     for check in checks:
-        # Get match scores for all invoices
+        check_day = date_to_day(check.get('date'))
+        candidates = range(len(formatted_invoices))
+        if amount_tolerance is not None:
+            check_amount = normalize_amount(check['amount'])
+            lo = bisect_left(sorted_amounts, check_amount * (1 - amount_tolerance))
+            hi = bisect_right(sorted_amounts, check_amount * (1 + amount_tolerance))
+            candidates = sorted(i for _, i in amount_index[lo:hi])
+        
+        # Get match scores for the candidate invoices
         scored_matches = []
-        for invoice in formatted_invoices:
-            score = is_match(check, invoice)
+        for i in candidates:
+            invoice = formatted_invoices[i]
+            score = _score_match(check, invoice, check_day, invoice_days[i])
             if score > 0.3:  # Only consider matches with at least 30% confidence
                 scored_matches.append({
                     'check': check,
@@ -492,6 +526,14 @@ async def show_matching_gui(check, potential_matches):
         return None
 
 async def process_input_folder(folder_path: str) -> tuple:
+    """Process all files in the input folder, then close the Llama client's HTTP session"""
+    try:
+        return await _process_input_folder(folder_path)
+    finally:
+        # The session is reopened if the client is used again
+        await llama_client.aclose()
+
+async def _process_input_folder(folder_path: str) -> tuple:
     """Process all files in the input folder"""
     print(f"\nProcessing files in folder: {folder_path}")
     pdf_files = [f for f in os.listdir(folder_path) if f.endswith('.pdf')]
@@ -551,4 +593,10 @@ async def main():
         logger.error(f"Error in main: {str(e)}")
         
 if __name__ == '__main__':
+    # Use uvloop's faster event loop where it's installed (it isn't available on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
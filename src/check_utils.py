@@ -1,12 +1,53 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List
 import json
-from decimal import Decimal
+import decimal
+from decimal import Decimal, ROUND_HALF_EVEN
 from .logger import setup_logger
 
 logger = setup_logger('check_processor')
 
+# Strips currency symbols and thousands separators from extracted amounts
+_AMOUNT_STRIP = str.maketrans('', '', '$,')
+
+# Money amounts are compared to the cent
+_CENT = Decimal('0.01')
+
+
+def _transaction_amount(amount) -> Decimal:
+    """Convert a transaction amount to an absolute Decimal without going through float repr"""
+    if isinstance(amount, Decimal):
+        return amount.copy_abs()
+    if isinstance(amount, float):
+        return Decimal(amount).quantize(_CENT, rounding=ROUND_HALF_EVEN).copy_abs()
+    if isinstance(amount, str):
+        return Decimal(amount.translate(_AMOUNT_STRIP)).copy_abs()
+    return Decimal(amount).copy_abs()
+
+
+# Number of threads used to write check images in parallel
+IMAGE_WRITE_WORKERS = 8
+
+
+def _write_image(file_path: str, data: bytes):
+    """Write a single image to disk, returning the exception on failure"""
+    try:
+        # The image is already one contiguous buffer, so write it without a buffered file object
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+        return None
+    except Exception as e:
+        return e
+
+
 class CheckProcessor:
     def __init__(self, base_dir: str = "check_images"):
         """Initialize the check processor with a base directory for saving images"""
@@ -28,46 +69,52 @@ class CheckProcessor:
             return []
         
         saved_paths = []
-        transaction_date = datetime.strptime(transaction['date'], '%Y-%m-%d')
+        # Transaction dates are YYYY-MM-DD, which fromisoformat parses much faster than strptime
+        transaction_date = datetime.fromisoformat(transaction['date'])
         
         # Create directory structure: base_dir/bank/YYYY/MM/DD/transaction_id/
         dir_path = os.path.join(
             self.base_dir,
             bank,
-            transaction_date.strftime('%Y'),
-            transaction_date.strftime('%m'),
-            transaction_date.strftime('%d'),
+            f"{transaction_date.year:04d}",
+            f"{transaction_date.month:02d}",
+            f"{transaction_date.day:02d}",
             transaction['transaction_id']
         )
         os.makedirs(dir_path, exist_ok=True)
         logger.info(f"Created directory structure: {dir_path}")
         
-        # Save each check's images
+        # Collect every image to write before touching the disk
+        pending = []
         for check in transaction.get('checks', []):
             check_num = check.get('extracted_check_number', 
                         check.get('check_number', f"check_{check['check_index']}")
                     )
             
-            # Save images
             check['image_paths'] = []
             for img in check.get('images', []):
                 filename = f"{check_num}_{img['type']}.png"
-                file_path = os.path.join(dir_path, filename)
-                
-                try:
-                    with open(file_path, 'wb') as f:
-                        f.write(img['data'])
-                    
-                    check['image_paths'].append(file_path)
-                    saved_paths.append(file_path)
-                    logger.info(f"Saved {img['type']} image for check {check_num} to {file_path}")
-                    
-                    # Remove binary data after saving
-                    img['data'] = None
-                    img['file_path'] = file_path
-                except Exception as e:
-                    logger.error(f"Error saving check image {filename}: {e}")
+                pending.append((check, check_num, img, os.path.join(dir_path, filename)))
         
+        # Write the images in parallel so the writes overlap
+        with ThreadPoolExecutor(max_workers=IMAGE_WRITE_WORKERS) as executor:
+            errors = list(executor.map(lambda item: _write_image(item[3], item[2].get('data')), pending))
+        
+        # Record the saved paths in one pass
+        for (check, check_num, img, file_path), error in zip(pending, errors):
+            if error is not None:
+                logger.error("Error saving check image %s: %s", os.path.basename(file_path), error)
+                continue
+            
+            check['image_paths'].append(file_path)
+            saved_paths.append(file_path)
+            logger.debug("Saved %s image for check %s to %s", img['type'], check_num, file_path)
+            
+            # Remove binary data after saving
+            img['data'] = None
+            img['file_path'] = file_path
+        
+        logger.info("Saved %d check images for transaction %s", len(saved_paths), transaction['transaction_id'])
         return saved_paths
 
     def validate_check_amounts(self, transaction: Dict) -> Dict:
@@ -83,29 +130,28 @@ class CheckProcessor:
             return {'valid': True, 'reason': 'No check images to validate'}
         
         # Convert transaction amount to Decimal for precise comparison
-        transaction_amount = Decimal(str(abs(transaction['amount'])))
-        check_amounts = []
+        transaction_amount = _transaction_amount(transaction['amount'])
+        total_check_amount = Decimal(0)
+        found_amount = False
         
         # Sum extracted amounts from checks
         for check in transaction.get('checks', []):
             if check.get('extracted_amount'):
                 try:
-                    # Remove currency symbols and convert to Decimal
-                    amount_str = str(check['extracted_amount']).replace('$', '').replace(',', '')
-                    check_amounts.append(Decimal(amount_str))
+                    # Remove currency symbols and add to the running total
+                    total_check_amount += Decimal(str(check['extracted_amount']).translate(_AMOUNT_STRIP))
+                    found_amount = True
                 except (ValueError, TypeError, decimal.InvalidOperation) as e:
                     error_msg = f"Invalid amount format in check {check.get('check_index')}: {check.get('extracted_amount')}"
                     logger.error(error_msg)
                     return {'valid': False, 'reason': error_msg}
         
-        if not check_amounts:
+        if not found_amount:
             logger.warning(f"No valid check amounts found for transaction {transaction.get('transaction_id')}")
             return {'valid': False, 'reason': 'No valid check amounts found'}
         
-        total_check_amount = sum(check_amounts)
-        
         # Allow for small rounding differences (within 1 cent)
-        if abs(total_check_amount - transaction_amount) <= Decimal('0.01'):
+        if abs(total_check_amount - transaction_amount) <= _CENT:
             logger.info(f"Amount validation successful for transaction {transaction.get('transaction_id')}")
             return {'valid': True, 'total_check_amount': float(total_check_amount)}
         else:
@@ -126,8 +172,9 @@ class CheckProcessor:
         Returns:
             Dictionary with validation results
         """
+        transaction_id = transaction.get('transaction_id')
         if not transaction.get('has_check_images'):
-            logger.info(f"No check images to validate confidence for transaction {transaction.get('transaction_id')}")
+            logger.info(f"No check images to validate confidence for transaction {transaction_id}")
             return {'valid': True, 'reason': 'No check images to validate'}
         
         low_confidence_checks = []
@@ -135,16 +182,16 @@ class CheckProcessor:
         for check in transaction.get('checks', []):
             confidence = check.get('confidence_score', 0)
             if confidence < min_confidence:
-                check_info = {
-                    'check_index': check['check_index'],
+                check_index = check['check_index']
+                low_confidence_checks.append({
+                    'check_index': check_index,
                     'confidence': confidence,
                     'amount': check.get('extracted_amount'),
                     'check_number': check.get('extracted_check_number')
-                }
-                low_confidence_checks.append(check_info)
+                })
                 logger.warning(
-                    f"Low confidence score ({confidence}) for check {check.get('check_number', check['check_index'])} "
-                    f"in transaction {transaction.get('transaction_id')}"
+                    f"Low confidence score ({confidence}) for check {check.get('check_number', check_index)} "
+                    f"in transaction {transaction_id}"
                 )
         
         if low_confidence_checks:
@@ -154,5 +201,5 @@ class CheckProcessor:
                 'low_confidence_checks': low_confidence_checks
             }
         
-        logger.info(f"Confidence validation successful for transaction {transaction.get('transaction_id')}")
+        logger.info(f"Confidence validation successful for transaction {transaction_id}")
         return {'valid': True}
@@ -1,4 +1,5 @@
 import os
+from functools import cache
 from dotenv import load_dotenv
 from cryptography.fernet import Fernet
 
@@ -17,26 +18,46 @@ BILLDOTCOM_API_KEY = os.getenv('BILLDOTCOM_API_KEY')
 WELLS_FARGO_API_KEY = os.getenv('WELLS_FARGO_API_KEY')
 
 # Bank credentials (encrypted)
-ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY', Fernet.generate_key().decode())
-cipher_suite = Fernet(ENCRYPTION_KEY.encode())
+ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')
+
+@cache
+def get_cipher_suite() -> Fernet:
+    """Return the Fernet cipher, creating it (and a throwaway key if none is configured) on first use"""
+    key = ENCRYPTION_KEY or Fernet.generate_key().decode()
+    return Fernet(key.encode())
 
 def decrypt_value(encrypted_value: str) -> str:
     """Decrypt an encrypted value"""
     if not encrypted_value:
         return ''
+    # Without a configured key nothing can be decrypted, so skip building a cipher
+    if not ENCRYPTION_KEY:
+        return encrypted_value
     try:
-        return cipher_suite.decrypt(encrypted_value.encode()).decode()
+        return get_cipher_suite().decrypt(encrypted_value.encode()).decode()
     except Exception:
         return encrypted_value
 
-# Bank of America credentials
-BOFA_USERNAME = decrypt_value(os.getenv('BOFA_USERNAME', ''))
-BOFA_PASSWORD = decrypt_value(os.getenv('BOFA_PASSWORD', ''))
+# Bank of America credentials (decrypted on first access)
+@cache
+def get_bofa_username() -> str:
+    return decrypt_value(os.getenv('BOFA_USERNAME', ''))
+
+@cache
+def get_bofa_password() -> str:
+    return decrypt_value(os.getenv('BOFA_PASSWORD', ''))
+
 BOFA_ACCOUNT_NUMBER = os.getenv('BOFA_ACCOUNT_NUMBER')  # Last 4 digits is sufficient
 
-# Wells Fargo credentials
-WELLS_FARGO_USERNAME = decrypt_value(os.getenv('WELLS_FARGO_USERNAME', ''))
-WELLS_FARGO_PASSWORD = decrypt_value(os.getenv('WELLS_FARGO_PASSWORD', ''))
+# Wells Fargo credentials (decrypted on first access)
+@cache
+def get_wells_fargo_username() -> str:
+    return decrypt_value(os.getenv('WELLS_FARGO_USERNAME', ''))
+
+@cache
+def get_wells_fargo_password() -> str:
+    return decrypt_value(os.getenv('WELLS_FARGO_PASSWORD', ''))
+
 WELLS_FARGO_ACCOUNT_NUMBER = os.getenv('WELLS_FARGO_ACCOUNT_NUMBER')  # Last 4 digits is sufficient
 
 # AWS Configuration
@@ -50,7 +71,7 @@ TRANSACTION_MATCH_THRESHOLD = 0.95  # Confidence threshold for transaction match
 
 def encrypt_value(value: str) -> str:
     """Encrypt a value for storing in environment variables"""
-    return cipher_suite.encrypt(value.encode()).decode()
+    return get_cipher_suite().encrypt(value.encode()).decode()
 
 def load_config():
     """Load and return all configuration values as a dictionary"""
@@ -59,11 +80,11 @@ def load_config():
         'KNACK_API_KEY': KNACK_API_KEY,
         'PLAID_CLIENT_ID': PLAID_CLIENT_ID,
         'PLAID_SECRET': PLAID_SECRET,
-        'BOFA_USERNAME': BOFA_USERNAME,
-        'BOFA_PASSWORD': BOFA_PASSWORD,
+        'BOFA_USERNAME': get_bofa_username(),
+        'BOFA_PASSWORD': get_bofa_password(),
         'BOFA_ACCOUNT_NUMBER': BOFA_ACCOUNT_NUMBER,
-        'WELLS_FARGO_USERNAME': WELLS_FARGO_USERNAME,
-        'WELLS_FARGO_PASSWORD': WELLS_FARGO_PASSWORD,
+        'WELLS_FARGO_USERNAME': get_wells_fargo_username(),
+        'WELLS_FARGO_PASSWORD': get_wells_fargo_password(),
         'WELLS_FARGO_ACCOUNT_NUMBER': WELLS_FARGO_ACCOUNT_NUMBER,
         'AWS_ACCESS_KEY_ID': AWS_ACCESS_KEY_ID,
         'AWS_SECRET_ACCESS_KEY': AWS_SECRET_ACCESS_KEY,
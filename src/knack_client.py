@@ -3,7 +3,7 @@ import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
-import json
+import orjson
 import os
 from dotenv import load_dotenv
 
@@ -13,7 +13,12 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 class KnackClient:
-    def __init__(self):
+    # Maximum number of page requests in flight at once
+    MAX_CONCURRENT_PAGES = 10
+    # Knack's maximum page size; fewer, larger pages cut per-request overhead
+    ROWS_PER_PAGE = 1000
+
+    def __init__(self, rows_per_page: int = ROWS_PER_PAGE):
         self.app_id = os.getenv('KNACK_APP_ID')
         self.api_key = os.getenv('KNACK_API_KEY')
         
@@ -21,74 +26,127 @@ class KnackClient:
             raise ValueError("Missing required Knack credentials in environment variables")
         
         self.base_url = f"https://api.knack.com/v1/objects/object_108/records"
+        self.rows_per_page = rows_per_page
         self.headers = {
             "X-Knack-Application-Id": self.app_id,
             "X-Knack-REST-API-Key": self.api_key,
             "Content-Type": "application/json"
         }
+        
+        # Cap concurrent page requests so a large fetch doesn't overload Knack
+        self._page_semaphore = asyncio.BoundedSemaphore(self.MAX_CONCURRENT_PAGES)
+        
+        # Shared HTTP session, created on first use so it binds to the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self):
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, reusing its keep-alive connections across calls"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=75)
+            )
+        return self._session
+    
+    async def aclose(self):
+        """Close the HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def _fetch_page(self, session: aiohttp.ClientSession, page: int, query_params: Dict, label: str) -> Dict:
+        """Fetch a single page of records"""
+        params = {**query_params, "page": page}
+        
+        async with self._page_semaphore:
+            async with session.get(self.base_url, headers=self.headers, params=params) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    logger.info(f"Retrieved {len(data.get('records', []))} {label} from page {page}")
+                    return data
+                
+                error_text = await response.text()
+                logger.error(f"Failed to fetch {label}: {response.status} - {error_text}")
+                raise Exception(f"Failed to fetch {label}: {response.status} - {error_text}")
     
-    async def get_records(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict]:
+    async def _fetch_all(self, session: aiohttp.ClientSession, filters: Dict, rows_per_page: int, label: str, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Fetch the first page, then the remaining pages it reports concurrently, stopping at the first short page"""
+        # Serialize the query once; only the page number changes between requests
+        query_params = {"rows_per_page": rows_per_page}
+        if filters:
+            query_params["filters"] = orjson.dumps(filters).decode()
+        if fields:
+            # Only return the fields the caller reads
+            query_params["fields"] = orjson.dumps(fields).decode()
+        
+        first_page = await self._fetch_page(session, 1, query_params, label)
+        pages = [first_page]
+        
+        # Request the pages Knack reports up front, so no requests are spent on empty pages
+        total_pages = int(first_page.get("total_pages") or 1)
+        if total_pages > 1:
+            # gather keeps results in page order; the page semaphore bounds how many run at once
+            pages.extend(await asyncio.gather(*(
+                self._fetch_page(session, page, query_params, label)
+                for page in range(2, total_pages + 1)
+            )))
+        
+        # A short page is the last one; stop there even if records were deleted since page 1
+        all_records = []
+        for data in pages:
+            records = data.get("records", [])
+            all_records.extend(records)
+            if len(records) < rows_per_page:
+                break
+        else:
+            # Every page was full, so records were added since page 1; keep going until a short page
+            page = len(pages)
+            while True:
+                page += 1
+                records = (await self._fetch_page(session, page, query_params, label)).get("records", [])
+                all_records.extend(records)
+                if len(records) < rows_per_page:
+                    break
+        
+        logger.info(f"Retrieved {len(all_records)} {label}")
+        return all_records
+    
+    async def get_records(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, fields: Optional[List[str]] = None) -> List[Dict]:
         """
         Get all records from Knack database with optional date filtering
         Args:
             start_date: Optional start date for filtering records
             end_date: Optional end date for filtering records
+            fields: Optional list of field keys to return instead of whole records
         Returns:
             List of records
         """
-        async with aiohttp.ClientSession() as session:
-            filters = {}
-            if start_date and end_date:
-                filters = {
-                    "match": "and",
-                    "rules": [
-                        {
-                            "field": "field_123",  # Date field
-                            "operator": "is during",
-                            "value": {
-                                "from": start_date.strftime("%Y-%m-%d"),
-                                "to": end_date.strftime("%Y-%m-%d")
-                            }
+        session = self._get_session()
+        filters = {}
+        if start_date and end_date:
+            filters = {
+                "match": "and",
+                "rules": [
+                    {
+                        "field": "field_123",  # Date field
+                        "operator": "is during",
+                        "value": {
+                            "from": start_date.strftime("%Y-%m-%d"),
+                            "to": end_date.strftime("%Y-%m-%d")
                         }
-                    ]
-                }
-            
-            all_records = []
-            page = 1
-            rows_per_page = 25
-            
-            while True:
-                params = {
-                    "page": page,
-                    "rows_per_page": rows_per_page
-                }
-                if filters:
-                    params["filters"] = json.dumps(filters)
-                
-                async with session.get(self.base_url, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        records = data.get("records", [])
-                        all_records.extend(records)
-                        
-                        # Check if we've received all records
-                        total_records = data.get("total_records", 0)
-                        current_count = len(all_records)
-                        
-                        logger.info(f"Retrieved {len(records)} records from page {page} (Total: {current_count}/{total_records})")
-                        
-                        if current_count >= total_records:
-                            break
-                        
-                        page += 1
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Failed to fetch Knack records: {response.status} - {error_text}")
-                        raise Exception(f"Failed to fetch Knack records: {response.status} - {error_text}")
-            
-            return all_records
+                    }
+                ]
+            }
+        
+        return await self._fetch_all(session, filters, self.rows_per_page, "Knack records", fields)
     
-    async def get_unbilled_records(self) -> List[Dict]:
+    async def get_unbilled_records(self, fields: Optional[List[str]] = None) -> List[Dict]:
         """
         Get unbilled records from Knack database
         These are records where:
@@ -96,61 +154,31 @@ class KnackClient:
         - field_1751 is No
         
         Note: Knack uses "Yes"/"No" strings for boolean fields
+        Args:
+            fields: Optional list of field keys to return instead of whole records
         Returns:
             List of unbilled records
         """
-        async with aiohttp.ClientSession() as session:
-            filters = {
-                "match": "and",
-                "rules": [
-                    {
-                        "field": "field_2386",
-                        "operator": "is",
-                        "value": "No"
-                    },
-                    {
-                        "field": "field_1751",
-                        "operator": "is",
-                        "value": "No"
-                    }
-                ]
-            }
-            
-            all_records = []
-            page = 1
-            rows_per_page = 25
-            
-            while True:
-                params = {
-                    "page": page,
-                    "rows_per_page": rows_per_page,
-                    "filters": json.dumps(filters)
+        session = self._get_session()
+        filters = {
+            "match": "and",
+            "rules": [
+                {
+                    "field": "field_2386",
+                    "operator": "is",
+                    "value": "No"
+                },
+                {
+                    "field": "field_1751",
+                    "operator": "is",
+                    "value": "No"
                 }
-                
-                async with session.get(self.base_url, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        records = data.get("records", [])
-                        all_records.extend(records)
-                        
-                        # Check if we've received all records
-                        total_records = data.get("total_records", 0)
-                        current_count = len(all_records)
-                        
-                        logger.info(f"Retrieved {len(records)} unbilled records from page {page} (Total: {current_count}/{total_records})")
-                        
-                        if current_count >= total_records:
-                            break
-                        
-                        page += 1
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Failed to fetch unbilled records: {response.status} - {error_text}")
-                        raise Exception(f"Failed to fetch unbilled records: {response.status} - {error_text}")
-            
-            return all_records
+            ]
+        }
+        
+        return await self._fetch_all(session, filters, self.rows_per_page, "unbilled records", fields)
 
-    async def get_unpaid_approved_billings(self) -> List[Dict]:
+    async def get_unpaid_approved_billings(self, fields: Optional[List[str]] = None) -> List[Dict]:
         """
         Get unpaid, approved billings that aren't deleted, written off, or already matched
         Filters:
@@ -161,74 +189,44 @@ class KnackClient:
         - field_2379 (Matched) = No
         
         Note: Knack uses "Yes"/"No" strings for boolean fields
+        Args:
+            fields: Optional list of field keys to return instead of whole records
         Returns:
             List of billing records
         """
-        async with aiohttp.ClientSession() as session:
-            filters = {
-                "match": "and",
-                "rules": [
-                    {
-                        "field": "field_1440",
-                        "operator": "is",
-                        "value": "Yes"
-                    },
-                    {
-                        "field": "field_2389",
-                        "operator": "is",
-                        "value": "No"
-                    },
-                    {
-                        "field": "field_2968",
-                        "operator": "is",
-                        "value": "No"
-                    },
-                    {
-                        "field": "field_1751",
-                        "operator": "is",
-                        "value": "No"
-                    },
-                    {
-                        "field": "field_2379",
-                        "operator": "is",
-                        "value": "No"
-                    }
-                ]
-            }
-            
-            all_records = []
-            page = 1
-            rows_per_page = 25
-            
-            while True:
-                params = {
-                    "page": page,
-                    "rows_per_page": rows_per_page,
-                    "filters": json.dumps(filters)
+        session = self._get_session()
+        filters = {
+            "match": "and",
+            "rules": [
+                {
+                    "field": "field_1440",
+                    "operator": "is",
+                    "value": "Yes"
+                },
+                {
+                    "field": "field_2389",
+                    "operator": "is",
+                    "value": "No"
+                },
+                {
+                    "field": "field_2968",
+                    "operator": "is",
+                    "value": "No"
+                },
+                {
+                    "field": "field_1751",
+                    "operator": "is",
+                    "value": "No"
+                },
+                {
+                    "field": "field_2379",
+                    "operator": "is",
+                    "value": "No"
                 }
-                
-                async with session.get(self.base_url, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        records = data.get("records", [])
-                        all_records.extend(records)
-                        
-                        # Check if we've received all records
-                        total_records = data.get("total_records", 0)
-                        current_count = len(all_records)
-                        
-                        logger.info(f"Retrieved {len(records)} unpaid approved billings from page {page} (Total: {current_count}/{total_records})")
-                        
-                        if current_count >= total_records:
-                            break
-                        
-                        page += 1
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Failed to fetch unpaid approved billings: {response.status} - {error_text}")
-                        raise Exception(f"Failed to fetch unpaid approved billings: {response.status} - {error_text}")
-            
-            return all_records
+            ]
+        }
+        
+        return await self._fetch_all(session, filters, self.rows_per_page, "unpaid approved billings", fields)
     
     async def update_record_status(self, record_id: str, payment_info: Dict):
         """
@@ -238,23 +236,23 @@ class KnackClient:
             payment_info: Dictionary containing payment details
         """
         try:
-            # For testing, just print the update
-            print(f"Would update record {record_id} with {payment_info}")
+            # For testing, just log the update
+            logger.info(f"Would update record {record_id} with {payment_info}")
             
             # TODO: Implement actual API call when ready
             """
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/{record_id}"
-                payload = {
-                    "field_123": payment_info.get("status"),
-                    "field_124": payment_info.get("date"),
-                    "field_125": payment_info.get("amount"),
-                    "field_126": payment_info.get("reference")
-                }
-                
-                async with session.put(url, headers=self.headers, json=payload) as response:
-                    if response.status != 200:
-                        print(f"Error updating Knack record: {response.status}")
+            session = self._get_session()
+            url = f"{self.base_url}/{record_id}"
+            payload = {
+                "field_123": payment_info.get("status"),
+                "field_124": payment_info.get("date"),
+                "field_125": payment_info.get("amount"),
+                "field_126": payment_info.get("reference")
+            }
+            
+            async with session.put(url, headers=self.headers, json=payload) as response:
+                if response.status != 200:
+                    logger.error(f"Error updating Knack record: {response.status}")
             """
         except Exception as e:
-            print(f"Error updating Knack record: {str(e)}")
+            logger.error(f"Error updating Knack record: {str(e)}")
@@ -1,13 +1,60 @@
 import aiohttp
+import asyncio
 import base64
+import functools
+import hashlib
 import logging
-import re
 from typing import Dict, Any, Optional
 from pathlib import Path
 import json
+import orjson
+import os
 
 logger = logging.getLogger(__name__)
 
+# Shared decoder for model output; strict=False accepts raw newlines inside strings
+_DECODER = json.JSONDecoder(strict=False)
+
+def _iter_json_objects(text: str):
+    """Yield each JSON object embedded in text, scanning forward with raw_decode so nested objects parse"""
+    index = text.find('{')
+    while index != -1:
+        try:
+            obj, end = _DECODER.raw_decode(text, index)
+        except json.JSONDecodeError:
+            index = text.find('{', index + 1)
+            continue
+        if isinstance(obj, dict):
+            yield obj
+        index = text.find('{', end)
+
+async def _read_last_line(content: aiohttp.StreamReader) -> str:
+    """Read a streamed body chunk by chunk and return its last non-empty line"""
+    last_line = b''
+    pending = []
+    async for chunk in content.iter_any():
+        pieces = chunk.split(b'\n')
+        pending.append(pieces[0])
+        for piece in pieces[1:]:
+            line = b''.join(pending)
+            if line.strip():
+                last_line = line
+            pending = [piece]
+    
+    line = b''.join(pending)
+    if line.strip():
+        last_line = line
+    return last_line.decode('utf-8').strip()
+
+@functools.lru_cache(maxsize=64)
+def _encode_image(path: str, mtime_ns: int) -> str:
+    """Base64-encode an image file; the modification time in the key means edited files are re-read"""
+    return base64.b64encode(Path(path).read_bytes()).decode()
+
+def _encoded_image(image_path: Path) -> str:
+    """Cached base64 encoding of an image file"""
+    return _encode_image(str(image_path), image_path.stat().st_mtime_ns)
+
 class LlamaClient:
     def __init__(self, host: str = "192.168.1.215", port: int = 11434):
         """Initialize the Llama client for interacting with Ollama API.
@@ -20,6 +67,37 @@ class LlamaClient:
         self.vision_model = "llama3.2-vision:11b"
         self.text_model = "llama3.2:latest"  # Use Llama 3.2 for text
         
+        # Shared HTTP session, created on first use so it binds to the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Limit in-flight requests per model; the vision model shares a single GPU slot
+        self._text_semaphore = asyncio.BoundedSemaphore(int(os.getenv('OLLAMA_MAX_CONCURRENCY', '2')))
+        self._vision_semaphore = asyncio.BoundedSemaphore(int(os.getenv('OLLAMA_VISION_CONCURRENCY', '1')))
+        
+        # Check extraction requests in flight, keyed by a hash of the prompt and image
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def __aenter__(self):
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, reusing its keep-alive connection to Ollama across requests"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=75)
+            )
+        return self._session
+    
+    async def aclose(self):
+        """Close the HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        
     async def _make_request(self, endpoint: str, data: Dict[str, Any]) -> Dict:
         """Make an async request to the Ollama API.
         
@@ -30,23 +108,27 @@ class LlamaClient:
         Returns:
             Dict containing the API response
         """
-        logger.debug(f"Making request to {endpoint} with data: {json.dumps(data, indent=2)}")
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{self.base_url}/{endpoint}", json=data) as response:
+        # Pretty-printing the payload (which can hold a base64 image) is only worth doing when it's logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Making request to {endpoint} with data: {orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()}")
+        session = self._get_session()
+        semaphore = self._vision_semaphore if data.get("model") == self.vision_model else self._text_semaphore
+        async with semaphore:
+            # Ollama only takes images as base64 inside the JSON body, so serialize it in one fast orjson pass
+            body = orjson.dumps(data)
+            async with session.post(f"{self.base_url}/{endpoint}", data=body, headers={"Content-Type": "application/json"}) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     raise Exception(f"API request failed ({response.status}): {error_text}")
                 
-                # Read the response as text since it's ndjson
-                response_text = await response.text()
-                logger.debug(f"Raw API response: {response_text}")
-                
-                # Take the last line as the final response
-                last_response = response_text.strip().split('\n')[-1]
-                try:
-                    return json.loads(last_response)
-                except json.JSONDecodeError as e:
-                    raise Exception(f"Failed to parse response: {response_text}")
+                # The body is ndjson; stream it and keep only the last line, which is the final response
+                last_response = await _read_last_line(response.content)
+        logger.debug("Final API response line: %s", last_response)
+        
+        try:
+            return orjson.loads(last_response)
+        except json.JSONDecodeError as e:
+            raise Exception(f"Failed to parse response: {last_response}")
 
     async def analyze_image(self, image_path: Path, prompt: str) -> Dict:
         """Analyze an image using the vision model.
@@ -58,9 +140,8 @@ class LlamaClient:
         Returns:
             Dict containing the model's response
         """
-        # Read and encode the image
-        with open(image_path, "rb") as img_file:
-            image_data = base64.b64encode(img_file.read()).decode()
+        # Read and encode the image off the event loop
+        image_data = await asyncio.to_thread(_encoded_image, image_path)
         
         # Prepare the request payload
         data = {
@@ -79,13 +160,13 @@ class LlamaClient:
             # Try to extract JSON from the response text
             try:
                 response_text = response.get('message', {}).get('content', '')
-                logger.debug(f"Raw response: {response_text}")
+                logger.debug("Raw response: %s", response_text)
                 # Find JSON-like content
                 start_idx = response_text.find('{')
                 end_idx = response_text.rfind('}') + 1
                 if start_idx >= 0 and end_idx > start_idx:
                     json_str = response_text[start_idx:end_idx]
-                    return json.loads(json_str)
+                    return orjson.loads(json_str)
                 return {}
             except json.JSONDecodeError:
                 logger.error(f"Failed to parse JSON from response: {response_text}")
@@ -116,26 +197,20 @@ class LlamaClient:
         try:
             response = await self._make_request("api/chat", data)
             response_text = response.get('message', {}).get('content', '')
-            logger.debug(f"Raw response: {response_text}")
+            logger.debug("Raw response: %s", response_text)
             
             # Try to parse the entire response as JSON first
             try:
-                result = json.loads(response_text)
+                result = orjson.loads(response_text)
                 if isinstance(result, dict) and 'matches' in result:
                     return result
             except json.JSONDecodeError:
                 pass
                 
-            # If that fails, try to find JSON-like content
-            matches = re.findall(r'\{[^}]+\}', response_text.replace('\n', ' '))
-            for match in matches:
-                try:
-                    result = json.loads(match)
-                    # If it parses as JSON and has expected fields, return it
-                    if isinstance(result, dict) and 'matches' in result:
-                        return result
-                except json.JSONDecodeError:
-                    continue
+            # If that fails, look for an embedded JSON object with the expected fields
+            for result in _iter_json_objects(response_text):
+                if 'matches' in result:
+                    return result
             
             return response_text
         except Exception as e:
@@ -148,9 +223,8 @@ class LlamaClient:
             logger.error(f"Image file not found: {image_path}")
             return None
 
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-            image_base64 = base64.b64encode(image_bytes).decode()
+        # Read and encode the image off the event loop
+        image_base64 = await asyncio.to_thread(_encoded_image, image_path)
 
         prompt = """You are a check processing assistant. Your task is to analyze this check image and extract key information.
 
@@ -180,6 +254,19 @@ Look in these specific locations:
 
 CRITICAL: Your response must be ONLY the JSON object. No other text. No explanations. No markdown."""
 
+        # Identical requests already in flight share one inference instead of running it again
+        key = hashlib.blake2b(prompt.encode() + image_base64.encode(), digest_size=16).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_check_info(prompt, image_base64))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        result = await asyncio.shield(task)
+        return dict(result) if result else result
+
+    async def _request_check_info(self, prompt: str, image_base64: str) -> Optional[Dict]:
+        """Run the check extraction prompt against the vision model"""
         try:
             response = await self._make_request("api/generate", data={
                 "model": self.vision_model,
@@ -198,20 +285,20 @@ CRITICAL: Your response must be ONLY the JSON object. No other text. No explanat
             # Try to extract just the JSON part
             response_text = response['response']
             
-            # Try to find JSON object in the response
+            # The prompt asks for a bare JSON object, so try parsing the whole response first
             try:
-                # Find the first { and last }
-                start = response_text.find('{')
-                end = response_text.rfind('}')
-                if start != -1 and end != -1:
-                    json_str = response_text[start:end+1]
-                    return json.loads(json_str)
-                else:
-                    logger.error("No JSON object found in response")
-                    return None
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON from response: {e}")
-                return None
+                result = _DECODER.decode(response_text)
+                if isinstance(result, dict):
+                    return result
+            except json.JSONDecodeError:
+                pass
+            
+            # Otherwise return the first JSON object in the response, ignoring any text around it
+            for result in _iter_json_objects(response_text):
+                return result
+            
+            logger.error(f"No JSON object found in response: {response_text}")
+            return None
 
         except Exception as e:
             logger.error(f"Error calling Llama API: {e}")
@@ -1,20 +1,33 @@
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+
+# Records buffered in memory before being written to the log file (errors are written immediately)
+LOG_BUFFER_CAPACITY = 1024
 
 def setup_logger(name: str = 'check_processing'):
     """Set up logger with file and console handlers"""
     logger = logging.getLogger(name)
+    
+    # Handlers are only attached once, however many modules call this
+    if logger.handlers:
+        return logger
+    
     logger.setLevel(logging.INFO)
     
     # Create logs directory if it doesn't exist
     log_dir = 'logs'
     os.makedirs(log_dir, exist_ok=True)
     
-    # Create file handler with daily rotation
-    log_file = os.path.join(log_dir, f'check_processing_{datetime.now().strftime("%Y%m%d")}.log')
-    file_handler = logging.FileHandler(log_file)
+    # Create file handler with daily rotation, buffered so records are written in batches
+    log_file = os.path.join(log_dir, 'check_processing.log')
+    file_handler = logging.handlers.TimedRotatingFileHandler(log_file, when='midnight', backupCount=30)
     file_handler.setLevel(logging.INFO)
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
     
     # Create console handler
     console_handler = logging.StreamHandler()
@@ -26,7 +39,7 @@ def setup_logger(name: str = 'check_processing'):
     console_handler.setFormatter(formatter)
     
     # Add the handlers to the logger
-    logger.addHandler(file_handler)
+    logger.addHandler(buffered_handler)
     logger.addHandler(console_handler)
     
     return logger
@@ -1,17 +1,53 @@
-from typing import List, Dict, Set
-from datetime import datetime
+from typing import List, Dict, Optional, Set
+from collections import defaultdict
+from datetime import date, datetime
+import asyncio
+import numpy as np
 from .nova_client import NovaClient
 from .financial_clients import FinancialClient
 
+# Maximum number of check image downloads in flight at once
+IMAGE_FETCH_WORKERS = 16
+
+# Maximum days between a record's date and a transaction's date for them to be compared
+MATCH_DATE_WINDOW_DAYS = 14
+
+# Record x transaction pairs above which candidates are found with a vectorized NumPy join
+VECTORIZE_MIN_PAIRS = 10000
+# Pairs compared per NumPy block, which bounds the size of the comparison matrices
+VECTORIZE_BLOCK_PAIRS = 4000000
+
+def _parse_date(value) -> Optional[date]:
+    """Parse a YYYY-MM-DD or MM/DD/YYYY date, or None if it can't be read"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value.strip(), '%m/%d/%Y').date()
+    except ValueError:
+        return None
+
 class BillingMatcher:
     def __init__(self, financial_clients: List[FinancialClient]):
         self.financial_clients = financial_clients
         self.nova_client = NovaClient()
         self.matched_transactions: Set[str] = set()
+        # Unmatched transactions grouped by amount in cents
+        self._amount_index: Dict[int, List[Dict]] = {}
+        # Prefetched check images by transaction id (None when a transaction has no image)
+        self._image_cache: Dict[str, Optional[bytes]] = {}
     
-    def find_matches(self, knack_records: List[Dict], start_date: datetime, end_date: datetime) -> List[Dict]:
+    async def find_matches(self, knack_records: List[Dict], start_date: datetime, end_date: datetime) -> List[Dict]:
         """
         Find matches between Knack records and financial transactions
+        The financial clients and Nova are async, so this runs on the caller's event loop
         Args:
             knack_records: List of unbilled records from Knack
             start_date: Start date for transaction search
@@ -21,68 +57,176 @@ class BillingMatcher:
         """
         matches = []
         
-        # Get transactions from all financial sources
+        # Get transactions from all financial sources at once rather than one after another
         all_transactions = []
-        for client in self.financial_clients:
-            transactions = client.get_transactions(start_date, end_date)
+        for transactions in await asyncio.gather(*(
+            client.get_transactions(start_date, end_date) for client in self.financial_clients
+        )):
             all_transactions.extend(transactions)
         
+        # Convert amounts to integer cents once, so matching compares exact ints rather than floats;
+        # kept alongside the inputs (by position) rather than written into the caller's dicts
+        unmatched = [transaction for transaction in all_transactions if transaction['id'] not in self.matched_transactions]
+        record_cents = [round(record['amount'] * 100) for record in knack_records]
+        transaction_cents = [round(transaction['amount'] * 100) for transaction in unmatched]
+        
+        # Index unmatched transactions by amount so each record only looks at same-amount candidates
+        self._amount_index = defaultdict(list)
+        for transaction, cents in zip(unmatched, transaction_cents):
+            self._amount_index[cents].append(transaction)
+        
+        # For large runs, find every record's candidates up front with one vectorized join
+        joined = None
+        if len(unmatched) * len(knack_records) > VECTORIZE_MIN_PAIRS:
+            joined = self._vectorized_candidates(knack_records, record_cents, unmatched, transaction_cents)
+        
+        # Download the check image of every transaction that could match some record
+        candidates = {}
+        for index, (record, cents) in enumerate(zip(knack_records, record_cents)):
+            for transaction in self._candidates_for(record, cents, joined[index] if joined is not None else None):
+                candidates[transaction['id']] = transaction
+        await self._prefetch_check_images(list(candidates.values()))
+        
+        # Analyze all of those check images with Nova concurrently, once per transaction
+        nova_analyses = await self._analyze_check_images({
+            transaction_id: check_image
+            for transaction_id, check_image in self._image_cache.items()
+            if check_image
+        })
+        
         # Find matches for each Knack record
-        for record in knack_records:
-            record_matches = self._find_record_matches(record, all_transactions)
+        for index, (record, cents) in enumerate(zip(knack_records, record_cents)):
+            record_matches = self._find_record_matches(
+                record, cents, nova_analyses, joined[index] if joined is not None else None
+            )
             matches.extend(record_matches)
         
         return matches
     
-    def _find_record_matches(self, record: Dict, transactions: List[Dict]) -> List[Dict]:
+    def _candidates_for(self, record: Dict, cents: int, joined: Optional[List[Dict]] = None) -> List[Dict]:
+        """Unmatched transactions with the record's amount, dated within the match window of the record"""
+        # Candidates from the vectorized join, less any transactions matched since
+        if joined is not None:
+            return [transaction for transaction in joined if transaction['id'] not in self.matched_transactions]
+        
+        candidates = self._amount_index.get(cents)
+        if not candidates:
+            return []
+        
+        # Records without a readable date are compared on amount alone
+        record_date = _parse_date(record.get('date'))
+        if record_date is None:
+            return list(candidates)
+        
+        return [
+            transaction for transaction in candidates
+            if (transaction_date := _parse_date(transaction.get('date'))) is None
+            or abs((record_date - transaction_date).days) <= MATCH_DATE_WINDOW_DAYS
+        ]
+    
+    def _vectorized_candidates(self, knack_records: List[Dict], record_cents: List[int], transactions: List[Dict], transaction_cents: List[int]) -> List[List[Dict]]:
+        """Each record's candidate transactions, by record position, comparing amounts and dates with NumPy"""
+        # Dates as day ordinals; -1 marks a missing or unreadable date, which matches any date
+        def ordinals(items: List[Dict]) -> np.ndarray:
+            return np.fromiter(
+                ((parsed.toordinal() if (parsed := _parse_date(item.get('date'))) else -1) for item in items),
+                dtype=np.int64, count=len(items)
+            )
+        
+        tx_cents = np.array(transaction_cents, dtype=np.int64)
+        tx_days = ordinals(transactions)
+        tx_undated = tx_days < 0
+        record_cents = np.array(record_cents, dtype=np.int64)
+        record_days = ordinals(knack_records)
+        
+        candidates: List[List[Dict]] = [[] for _ in knack_records]
+        
+        # Compare a block of records at a time against every transaction
+        block = max(1, VECTORIZE_BLOCK_PAIRS // len(transactions))
+        for start in range(0, len(knack_records), block):
+            cents = record_cents[start:start + block]
+            days = record_days[start:start + block]
+            same_amount = tx_cents[:, None] == cents[None, :]
+            near_date = (
+                (np.abs(tx_days[:, None] - days[None, :]) <= MATCH_DATE_WINDOW_DAYS)
+                | tx_undated[:, None]
+                | (days < 0)[None, :]
+            )
+            # nonzero walks transactions in order, so candidates keep the same order as the index
+            for tx_index, record_index in zip(*(indices.tolist() for indices in np.nonzero(same_amount & near_date))):
+                candidates[start + record_index].append(transactions[tx_index])
+        return candidates
+    
+    async def _analyze_check_images(self, check_images: Dict[str, bytes]) -> Dict[str, Dict]:
+        """Run Nova over every check image concurrently, keyed by transaction id"""
+        # NovaClient caps the number of requests in flight, so every analysis is started at once
+        transaction_ids = list(check_images)
+        results = await asyncio.gather(*(
+            self.nova_client.analyze_check_image(transaction_id, check_images[transaction_id])
+            for transaction_id in transaction_ids
+        ))
+        return dict(zip(transaction_ids, results))
+    
+    def _find_record_matches(self, record: Dict, cents: int, nova_analyses: Dict[str, Dict], joined: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Find matches for a single Knack record
         Args:
             record: Single Knack record
-            transactions: List of financial transactions
+            cents: The record's amount in integer cents
+            nova_analyses: Nova analysis for each candidate transaction id with a check image
+            joined: The record's candidates from the vectorized join, if one was run
         Returns:
             List of potential matches with confidence scores
         """
         matches = []
         
-        for transaction in transactions:
-            # Skip if transaction already matched
-            if transaction['id'] in self.matched_transactions:
-                continue
+        # Only unmatched transactions with the same amount and a nearby date are candidates
+        for transaction in self._candidates_for(record, cents, joined):
+            # Check image and its Nova analysis, if one was available
+            check_image = self._get_check_image(transaction)
             
-            # Check if amounts match
-            if self._amounts_match(record['amount'], transaction['amount']):
-                # Get check image if available
-                check_image = self._get_check_image(transaction)
+            if check_image:
+                nova_analysis = nova_analyses[transaction['id']]
                 
-                if check_image:
-                    # Analyze check image with Nova
-                    nova_analysis = self.nova_client.analyze_check_image(check_image)
-                    
-                    if self._verify_match(record, transaction, nova_analysis):
-                        matches.append({
-                            'knack_record': record,
-                            'transaction': transaction,
-                            'check_image': check_image,
-                            'nova_analysis': nova_analysis,
-                            'confidence_score': nova_analysis['confidence_score']
-                        })
-                        self.matched_transactions.add(transaction['id'])
+                if self._verify_match(record, transaction, nova_analysis):
+                    matches.append({
+                        'knack_record': record,
+                        'transaction': transaction,
+                        'check_image': check_image,
+                        'nova_analysis': nova_analysis,
+                        'confidence_score': nova_analysis['confidence_score']
+                    })
+                    self.matched_transactions.add(transaction['id'])
+                    # Matched transactions drop out of the index so later records never see them
+                    self._amount_index[cents].remove(transaction)
         
         return matches
     
-    def _amounts_match(self, record_amount: float, transaction_amount: float) -> bool:
-        """Check if amounts match within a small tolerance"""
-        return abs(record_amount - transaction_amount) < 0.01
+    async def _prefetch_check_images(self, transactions: List[Dict]):
+        """Download the check images for a set of transactions concurrently"""
+        semaphore = asyncio.Semaphore(IMAGE_FETCH_WORKERS)
+        
+        async def fetch(transaction: Dict) -> Optional[bytes]:
+            async with semaphore:
+                return await self._fetch_check_image(transaction)
+        
+        images = await asyncio.gather(*(fetch(transaction) for transaction in transactions))
+        self._image_cache = {
+            transaction['id']: check_image for transaction, check_image in zip(transactions, images)
+        }
     
-    def _get_check_image(self, transaction: Dict) -> bytes:
-        """Get check image for a transaction if available"""
+    async def _fetch_check_image(self, transaction: Dict) -> Optional[bytes]:
+        """Download the check image for a transaction if available"""
         try:
             client = self._get_client_for_transaction(transaction)
-            return client.get_check_image(transaction['id'])
+            return await client.get_check_image(transaction['id'])
         except Exception:
             return None
     
+    def _get_check_image(self, transaction: Dict) -> Optional[bytes]:
+        """Get the prefetched check image for a transaction if available"""
+        return self._image_cache.get(transaction['id'])
+    
     def _get_client_for_transaction(self, transaction: Dict) -> FinancialClient:
         """Get the appropriate financial client for a transaction"""
         # TODO: Implement logic to determine which client to use based on transaction
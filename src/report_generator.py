@@ -1,17 +1,91 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import os
+import struct
 from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from PIL import Image as PILImage
 from io import BytesIO
 from .config import REPORT_OUTPUT_DIR
 
+# Width of check images in the report, in points
+CHECK_IMAGE_WIDTH = 400
+
+# JPEG start-of-frame markers, which carry the image dimensions
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) read from a JPEG's frame header, or None if data isn't a readable JPEG"""
+    if not data.startswith(b'\xff\xd8'):
+        return None
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        # Fill bytes and markers without a length field
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        length = struct.unpack_from('>H', data, offset + 2)[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > len(data):
+                return None
+            height, width = struct.unpack_from('>HH', data, offset + 5)
+            return (width, height) if width and height else None
+        offset += 2 + length
+    return None
+
+# reportlab and PIL are imported when a report is built, so importing this module stays cheap
+
+@lru_cache(maxsize=None)
+def _check_image_class():
+    """The flowable class for check images, defined on first use"""
+    from reportlab.platypus import Flowable
+    from reportlab.lib.utils import ImageReader
+    
+    class _CheckImage(Flowable):
+        """Check image drawn from a prepared JPEG buffer"""
+        def __init__(self, buffer: BytesIO, width: int, height: int):
+            super().__init__()
+            self._buffer = buffer
+            self.width = width
+            self.height = height
+        
+        def wrap(self, availWidth, availHeight):
+            return self.width, self.height
+        
+        def draw(self):
+            self.canv.drawImage(ImageReader(self._buffer), 0, 0, width=self.width, height=self.height)
+    
+    return _CheckImage
+
+@lru_cache(maxsize=None)
+def _table_style():
+    """Style shared by every match's details table; setStyle copies its commands into each table"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
 class ReportGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
+        # Paragraph styles, loaded with reportlab when the first report is generated
+        self.styles = None
         os.makedirs(REPORT_OUTPUT_DIR, exist_ok=True)
     
     def generate_report(self, matches: List[Dict]) -> str:
@@ -22,6 +96,13 @@ class ReportGenerator:
         Returns:
             Path to the generated report
         """
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
+        if self.styles is None:
+            self.styles = getSampleStyleSheet()
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = os.path.join(REPORT_OUTPUT_DIR, f'billing_matches_{timestamp}.pdf')
         
@@ -33,16 +114,61 @@ class ReportGenerator:
         story.append(title)
         story.append(Spacer(1, 20))
         
-        # Add matches
-        for match in matches:
-            story.extend(self._create_match_section(match))
-            story.append(Spacer(1, 30))
+        # Prepare check images in parallel (PIL releases the GIL while decoding and encoding),
+        # adding each match as its image comes back
+        image_buffers = []
+        with ThreadPoolExecutor() as executor:
+            for match, prepared_image in zip(matches, executor.map(self._prepare_image, matches)):
+                if isinstance(prepared_image, tuple):
+                    image_buffers.append(prepared_image[0])
+                story.extend(self._create_match_section(match, prepared_image))
+                story.append(Spacer(1, 30))
         
-        doc.build(story)
+        # Flowables can be drawn more than once (e.g. when split across pages), so the image
+        # buffers are only released once the whole document is built
+        try:
+            doc.build(story)
+        finally:
+            for buffer in image_buffers:
+                buffer.close()
         return report_path
     
-    def _create_match_section(self, match: Dict) -> List:
+    def _prepare_image(self, match: Dict) -> Union[Tuple[BytesIO, int], Exception, None]:
+        """Resize and re-encode a match's check image; returns the JPEG buffer and its height,
+        the exception if the image couldn't be read, or None when there is no image"""
+        if not match.get('check_image'):
+            return None
+        
+        # JPEGs that already fit on the page are embedded as they are, without decoding them
+        size = _jpeg_size(match['check_image'])
+        if size is not None:
+            width, height = size
+            if width <= CHECK_IMAGE_WIDTH and height <= CHECK_IMAGE_WIDTH * 3:
+                return BytesIO(match['check_image']), int(CHECK_IMAGE_WIDTH * height / width)
+        
+        try:
+            from PIL import Image as PILImage
+            
+            img = PILImage.open(BytesIO(match['check_image']))
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            
+            # Shrink image in place to fit on page, keeping its aspect ratio
+            aspect = img.height / img.width
+            img.thumbnail((CHECK_IMAGE_WIDTH, CHECK_IMAGE_WIDTH * 3), PILImage.Resampling.BILINEAR)
+            
+            # Save to temporary buffer
+            img_buffer = BytesIO()
+            img.save(img_buffer, format='JPEG', quality=75, optimize=False, subsampling=2)
+            img_buffer.seek(0)
+            return img_buffer, int(CHECK_IMAGE_WIDTH * aspect)
+        except Exception as e:
+            return e
+    
+    def _create_match_section(self, match: Dict, prepared_image: Union[Tuple[BytesIO, int], Exception, None]) -> List:
         """Create a section for a single match"""
+        from reportlab.platypus import Table, Paragraph, Spacer
+        
         elements = []
         
         # Match header
@@ -64,43 +190,16 @@ class ReportGenerator:
         ]
         
         table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(_table_style())
         elements.append(table)
         elements.append(Spacer(1, 10))
         
         # Add check image if available
-        if match.get('check_image'):
-            try:
-                img = PILImage.open(BytesIO(match['check_image']))
-                img = img.convert('RGB')
-                
-                # Resize image to fit on page
-                max_width = 400
-                aspect = img.height / img.width
-                img = img.resize((max_width, int(max_width * aspect)))
-                
-                # Save to temporary buffer
-                img_buffer = BytesIO()
-                img.save(img_buffer, format='JPEG')
-                img_buffer.seek(0)
-                
-                # Add to report
-                img = Image(img_buffer, width=max_width, height=int(max_width * aspect))
-                elements.append(img)
-            except Exception as e:
-                elements.append(Paragraph(f"Error displaying check image: {str(e)}", 
-                                       self.styles['Normal']))
+        if isinstance(prepared_image, Exception):
+            elements.append(Paragraph(f"Error displaying check image: {str(prepared_image)}", 
+                                   self.styles['Normal']))
+        elif prepared_image is not None:
+            img_buffer, height = prepared_image
+            elements.append(_check_image_class()(img_buffer, CHECK_IMAGE_WIDTH, height))
         
         return elements